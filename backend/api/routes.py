@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Body
-from services.substitution import get_substitution
-from services.flavordb_service import get_flavor_data, get_all_flavors, get_flavor_categories, get_flavor_pairings, analyze_flavor_profile
-from services.nlp_service import parse_user_query, get_smart_suggestions, analyze_ingredients_for_allergies, get_taste_based_recommendations
-from services.calorie_service import get_calorie_data, calculate_recipe_calories
+from fastapi import APIRouter, Body, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from services.substitution import get_substitution, get_substitutions_batch
+from services.flavordb_service import get_flavor_data, get_all_flavors, get_flavor_page, stream_flavor_page, get_flavor_categories, get_flavor_pairings, analyze_flavor_profile, get_flavor_vector, get_flavor_vectors_batch, expand_pairings, get_best_complements
+from services.flavor_catalog import etag_matches
+from services.nlp_service import parse_user_query, parse_user_queries_batch, get_smart_suggestions, analyze_ingredients_for_allergies, get_taste_based_recommendations
+from services.calorie_service import get_calorie_data, calculate_recipe_calories, calculate_recipes_calories_batch
+from services.metrics_service import get_metrics
 
 router = APIRouter()
 
@@ -11,15 +14,30 @@ def substitute(ingredient: str):
     """Get ingredient substitutions"""
     return get_substitution(ingredient)
 
+@router.post("/substitute/batch")
+def substitute_batch(ingredients: list[str] = Body(...)):
+    """Get ingredient substitutions for many ingredients at once"""
+    return get_substitutions_batch(ingredients)
+
 @router.get("/flavor")
-def flavor(ingredient: str):
+async def flavor(ingredient: str):
     """Get flavor analysis for an ingredient"""
-    return get_flavor_data(ingredient)
+    return await get_flavor_data(ingredient)
 
 @router.get("/flavors")
-def flavors():
-    """Get all available flavors from database"""
-    return get_all_flavors()
+async def flavors(cursor: str = None, limit: int = Query(50, ge=1, le=500), if_none_match: str = Header(None)):
+    """Get all available flavors from the local snapshot, one cursor page at a time"""
+    page = await get_flavor_page(cursor, limit)
+    if page is None:
+        # Nothing prefetched yet
+        return await get_all_flavors()
+    if "error" in page:
+        return page
+
+    headers = {"ETag": page["etag"]}
+    if etag_matches(if_none_match, page["etag"]):
+        return Response(status_code=304, headers=headers)
+    return StreamingResponse(stream_flavor_page(page), media_type="application/json", headers=headers)
 
 @router.get("/flavor-categories")
 def flavor_categories():
@@ -36,15 +54,40 @@ def flavor_profile(ingredients: list[str]):
     """Analyze flavor profile of multiple ingredients"""
     return analyze_flavor_profile(ingredients)
 
+@router.post("/flavor-profile/vector")
+def flavor_vector(ingredients: list = Body(...)):
+    """Weighted numeric flavor profile of a recipe"""
+    return get_flavor_vector(ingredients)
+
+@router.post("/flavor-profile/vector/batch")
+def flavor_vectors_batch(recipes: list = Body(...)):
+    """Weighted numeric flavor profiles for many recipes at once"""
+    return get_flavor_vectors_batch(recipes)
+
+@router.post("/pairings/expand")
+def pairings_expand(ingredients: list[str] = Body(...), hops: int = Query(2, ge=1, le=5), limit: int = Query(20, ge=1, le=200)):
+    """Get ingredients within a few pairing steps of the given ones"""
+    return expand_pairings(ingredients, hops, limit)
+
+@router.post("/pairings/complements")
+def pairings_complements(ingredients: list[str] = Body(...), limit: int = Query(10, ge=1, le=200)):
+    """Get the ingredients that best complement a set of ingredients"""
+    return get_best_complements(ingredients, limit)
+
 @router.post("/nlp/parse")
-def parse_query(query: str):
-    """Parse user query for allergies and tastes"""
-    return parse_user_query(query)
+async def parse_query(query: str, entities: bool = False):
+    """Parse user query for allergies and tastes (entities=true adds named entities)"""
+    return await parse_user_query(query, entities)
+
+@router.post("/nlp/parse/batch")
+def parse_query_batch(queries: list[str] = Body(...), entities: bool = False):
+    """Parse many user queries at once"""
+    return parse_user_queries_batch(queries, entities)
 
 @router.post("/nlp/suggestions")
-def smart_suggestions(query: str):
+async def smart_suggestions(query: str):
     """Get smart ingredient suggestions based on query"""
-    return get_smart_suggestions(query)
+    return await get_smart_suggestions(query)
 
 @router.post("/nlp/allergy-check")
 def allergy_check(ingredients: list, user_allergies: list):
@@ -65,3 +108,13 @@ def calories(ingredient: str):
 def recipe_calories(ingredients: list = Body(...)):
     """Calculate total calories for a recipe"""
     return calculate_recipe_calories(ingredients)
+
+@router.post("/calories/recipes/batch")
+def recipes_calories_batch(recipes: list = Body(...)):
+    """Calculate total calories for many recipes at once"""
+    return calculate_recipes_calories_batch(recipes)
+
+@router.get("/metrics")
+def metrics():
+    """Get runtime counters for models and caches"""
+    return get_metrics()
@@ -4,3 +4,62 @@ from dotenv import load_dotenv
 load_dotenv()
 
 FOODOSCOPE_API_KEY = os.getenv("FOODOSCOPE_API_KEY", "your_api_key_here")
+
+# Load the substitution model during startup rather than on the first request.
+# Autoscaled workers that must come up fast can set this to "false".
+PRELOAD_MODELS = os.getenv("PRELOAD_MODELS", "true").lower() == "true"
+
+# Bounded LRU cache for /substitute results; TTL in seconds (0 disables expiry)
+SUBSTITUTION_CACHE_SIZE = int(os.getenv("SUBSTITUTION_CACHE_SIZE", "1024"))
+SUBSTITUTION_CACHE_TTL = float(os.getenv("SUBSTITUTION_CACHE_TTL", "3600"))
+
+# Read-only SQLite nutrition store built with `python -m services.nutrition_store`.
+# Empty means the built-in calorie table is served from memory.
+NUTRITION_STORE_PATH = os.getenv("NUTRITION_STORE_PATH", "")
+
+# Persistent cache for flavor data fetched from the external API (SQLite, shared by workers)
+FLAVOR_CACHE_PATH = os.getenv("FLAVOR_CACHE_PATH") or os.path.join(
+    os.path.dirname(__file__), "..", "ml", "flavor_cache.sqlite"
+)
+FLAVOR_CACHE_TTL = float(os.getenv("FLAVOR_CACHE_TTL", str(7 * 24 * 3600)))
+FLAVOR_CACHE_MAX_ENTRIES = int(os.getenv("FLAVOR_CACHE_MAX_ENTRIES", "10000"))
+
+# External flavor API and the shared async HTTP pool used to reach it
+FLAVOR_API_BASE_URL = os.getenv("FLAVOR_API_BASE_URL", "https://example.com/recipe2-api").rstrip("/")
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("HTTP_MAX_KEEPALIVE", "20"))
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "10"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+
+# Background walk of every upstream flavor page into the local /flavors snapshot.
+# Interval in seconds between refreshes; 0 disables the prefetch.
+FLAVOR_PREFETCH_INTERVAL = float(os.getenv("FLAVOR_PREFETCH_INTERVAL", "3600"))
+FLAVOR_PREFETCH_PAGE_SIZE = int(os.getenv("FLAVOR_PREFETCH_PAGE_SIZE", "100"))
+FLAVOR_PREFETCH_MAX_PAGES = int(os.getenv("FLAVOR_PREFETCH_MAX_PAGES", "1000"))
+
+# Circuit breaker for the flavor API: open after this many consecutive failures,
+# probe again after the reset interval in seconds
+FLAVOR_BREAKER_FAILURES = int(os.getenv("FLAVOR_BREAKER_FAILURES", "5"))
+FLAVOR_BREAKER_RESET_SECONDS = float(os.getenv("FLAVOR_BREAKER_RESET_SECONDS", "30"))
+
+# NLP micro-batching: how long to collect concurrent queries (ms) and the nlp.pipe batch size
+NLP_BATCH_WINDOW_MS = float(os.getenv("NLP_BATCH_WINDOW_MS", "5"))
+NLP_BATCH_SIZE = int(os.getenv("NLP_BATCH_SIZE", "64"))
+
+# Default NLP pipeline profile: "full" (adds parser and NER entities), "lemmas" or "lexical".
+# The lighter profiles return empty "entities" unless a request asks for them.
+NLP_PROFILE = os.getenv("NLP_PROFILE", "full")
+
+# NLP worker processes: parse in this many processes (0 = in the server process),
+# batches queued or running across them (0 = twice the workers), queries waiting
+# to be batched, and how long a batch waits for a free slot before the request fails
+NLP_WORKERS = int(os.getenv("NLP_WORKERS", "0"))
+NLP_MAX_PENDING_BATCHES = int(os.getenv("NLP_MAX_PENDING_BATCHES", "0"))
+NLP_QUEUE_SIZE = int(os.getenv("NLP_QUEUE_SIZE", "1024"))
+NLP_SUBMIT_TIMEOUT = float(os.getenv("NLP_SUBMIT_TIMEOUT", "1"))
+
+# Parsed NLP queries cached by normalized text: entries, expiry in seconds (0 = never),
+# and an optional file that keeps the cache across restarts (empty = memory only)
+NLP_CACHE_SIZE = int(os.getenv("NLP_CACHE_SIZE", "4096"))
+NLP_CACHE_TTL = float(os.getenv("NLP_CACHE_TTL", "0"))
+NLP_CACHE_PATH = os.getenv("NLP_CACHE_PATH", "")
@@ -1,6 +1,12 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api.routes import router
+from app.config import PRELOAD_MODELS, FLAVOR_PREFETCH_INTERVAL
+from services.metrics_service import model_registry
+from services.http_client import http_client
+from services.flavordb_service import run_flavor_prefetch
+from services.nlp_service import nlp_pool, close_nlp
 
 app = FastAPI()
 
@@ -14,3 +20,28 @@ app.add_middleware(
 )
 
 app.include_router(router)
+
+@app.on_event("startup")
+def preload_models():
+    """Load the substitution model and start the NLP workers before the first request arrives"""
+    if PRELOAD_MODELS and model_registry is not None:
+        model_registry.load()
+    if nlp_pool is not None:
+        nlp_pool.start()
+
+background_tasks = []
+
+@app.on_event("startup")
+async def start_flavor_prefetch():
+    """Keep the /flavors catalogue snapshot fresh in the background"""
+    if FLAVOR_PREFETCH_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(run_flavor_prefetch(FLAVOR_PREFETCH_INTERVAL)))
+
+@app.on_event("shutdown")
+async def stop_background_work():
+    """Stop background work and close pooled upstream connections"""
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await http_client.aclose()
+    await asyncio.to_thread(close_nlp)
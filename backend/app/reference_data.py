@@ -0,0 +1,365 @@
+"""
+Static reference data shared by every service
+
+Each table is built once per process and deeply frozen (dicts become
+read-only mappings, lists become tuples), so request handlers can hand out
+entries directly without copying or rebuilding them.
+"""
+from types import MappingProxyType
+
+def freeze(value):
+    """Recursively convert dicts, lists and sets into their immutable counterparts"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+def thaw(value):
+    """Return a mutable deep copy of a frozen table or entry"""
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+# Calories and macros per 100g/100ml for common ingredients
+CALORIE_DATABASE = freeze({
+    # Dairy products
+    "milk": {"calories": 42, "unit": "kcal per 100ml", "protein": 3.4, "carbs": 5.0, "fat": 1.0},
+    "almond milk": {"calories": 15, "unit": "kcal per 100ml", "protein": 0.6, "carbs": 0.3, "fat": 1.2},
+    "soy milk": {"calories": 33, "unit": "kcal per 100ml", "protein": 2.8, "carbs": 2.1, "fat": 1.8},
+    "coconut milk": {"calories": 230, "unit": "kcal per 100ml", "protein": 2.3, "carbs": 5.5, "fat": 24.0},
+    "oat milk": {"calories": 47, "unit": "kcal per 100ml", "protein": 1.3, "carbs": 6.7, "fat": 1.8},
+    "cashew milk": {"calories": 25, "unit": "kcal per 100ml", "protein": 0.9, "carbs": 1.6, "fat": 2.0},
+    "cheese": {"calories": 402, "unit": "kcal per 100g", "protein": 25.0, "carbs": 1.3, "fat": 33.0},
+    "mozzarella": {"calories": 280, "unit": "kcal per 100g", "protein": 22.0, "carbs": 2.2, "fat": 22.0},
+    "butter": {"calories": 717, "unit": "kcal per 100g", "protein": 0.9, "carbs": 0.1, "fat": 81.0},
+    "ghee": {"calories": 880, "unit": "kcal per 100g", "protein": 0.3, "carbs": 0.0, "fat": 98.0},
+    "margarine": {"calories": 720, "unit": "kcal per 100g", "protein": 0.2, "carbs": 0.5, "fat": 80.0},
+
+    # Oils and fats
+    "olive oil": {"calories": 884, "unit": "kcal per 100ml", "protein": 0.0, "carbs": 0.0, "fat": 100.0},
+    "coconut oil": {"calories": 862, "unit": "kcal per 100ml", "protein": 0.0, "carbs": 0.0, "fat": 100.0},
+    "avocado oil": {"calories": 884, "unit": "kcal per 100ml", "protein": 0.0, "carbs": 0.0, "fat": 100.0},
+
+    # Eggs
+    "eggs": {"calories": 155, "unit": "kcal per 100g", "protein": 13.0, "carbs": 1.1, "fat": 11.0},
+    "egg": {"calories": 155, "unit": "kcal per 100g", "protein": 13.0, "carbs": 1.1, "fat": 11.0},
+
+    # Flours and grains
+    "flour": {"calories": 364, "unit": "kcal per 100g", "protein": 10.0, "carbs": 76.0, "fat": 1.0},
+    "almond flour": {"calories": 579, "unit": "kcal per 100g", "protein": 21.0, "carbs": 21.0, "fat": 50.0},
+    "coconut flour": {"calories": 444, "unit": "kcal per 100g", "protein": 19.0, "carbs": 16.0, "fat": 13.0},
+    "oat flour": {"calories": 389, "unit": "kcal per 100g", "protein": 17.0, "carbs": 66.0, "fat": 7.0},
+    "whole wheat flour": {"calories": 340, "unit": "kcal per 100g", "protein": 13.0, "carbs": 72.0, "fat": 2.5},
+    "gluten-free flour": {"calories": 380, "unit": "kcal per 100g", "protein": 8.0, "carbs": 78.0, "fat": 2.0},
+
+    # Sweeteners
+    "sugar": {"calories": 387, "unit": "kcal per 100g", "protein": 0.0, "carbs": 100.0, "fat": 0.0},
+    "honey": {"calories": 304, "unit": "kcal per 100g", "protein": 0.3, "carbs": 82.0, "fat": 0.0},
+    "maple syrup": {"calories": 260, "unit": "kcal per 100g", "protein": 0.0, "carbs": 67.0, "fat": 0.3},
+    "stevia": {"calories": 0, "unit": "kcal per 100g", "protein": 0.0, "carbs": 0.0, "fat": 0.0},
+    "coconut sugar": {"calories": 375, "unit": "kcal per 100g", "protein": 0.5, "carbs": 94.0, "fat": 0.1},
+    "brown sugar": {"calories": 380, "unit": "kcal per 100g", "protein": 0.0, "carbs": 98.0, "fat": 0.0},
+
+    # Fruits
+    "apple": {"calories": 52, "unit": "kcal per 100g", "protein": 0.3, "carbs": 14.0, "fat": 0.2},
+    "banana": {"calories": 89, "unit": "kcal per 100g", "protein": 1.1, "carbs": 23.0, "fat": 0.3},
+    "lemon": {"calories": 29, "unit": "kcal per 100g", "protein": 1.1, "carbs": 9.3, "fat": 0.3},
+    "vanilla": {"calories": 288, "unit": "kcal per 100g", "protein": 0.1, "carbs": 12.7, "fat": 0.1},
+
+    # Vegetables and herbs
+    "garlic": {"calories": 149, "unit": "kcal per 100g", "protein": 6.4, "carbs": 33.0, "fat": 0.5},
+    "basil": {"calories": 23, "unit": "kcal per 100g", "protein": 3.2, "carbs": 2.7, "fat": 0.6},
+    "ginger": {"calories": 80, "unit": "kcal per 100g", "protein": 1.8, "carbs": 18.0, "fat": 0.8},
+    "mint": {"calories": 70, "unit": "kcal per 100g", "protein": 3.8, "carbs": 15.0, "fat": 0.9},
+    "cinnamon": {"calories": 247, "unit": "kcal per 100g", "protein": 4.0, "carbs": 81.0, "fat": 1.2},
+
+    # Other ingredients
+    "chocolate": {"calories": 546, "unit": "kcal per 100g", "protein": 5.0, "carbs": 61.0, "fat": 31.0},
+    "coffee": {"calories": 1, "unit": "kcal per 100ml", "protein": 0.1, "carbs": 0.0, "fat": 0.0},
+    "applesauce": {"calories": 68, "unit": "kcal per 100g", "protein": 0.2, "carbs": 17.0, "fat": 0.1},
+    "flax eggs": {"calories": 37, "unit": "kcal per egg", "protein": 1.3, "carbs": 2.0, "fat": 2.9},
+    "chia eggs": {"calories": 65, "unit": "kcal per egg", "protein": 2.1, "carbs": 5.1, "fat": 4.2},
+    "silken tofu": {"calories": 55, "unit": "kcal per 100g", "protein": 8.0, "carbs": 1.9, "fat": 3.2},
+    "nutritional yeast": {"calories": 290, "unit": "kcal per 100g", "protein": 50.0, "carbs": 7.0, "fat": 0.5},
+    "cashew cheese": {"calories": 300, "unit": "kcal per 100g", "protein": 10.0, "carbs": 15.0, "fat": 25.0},
+    "tofu": {"calories": 76, "unit": "kcal per 100g", "protein": 8.0, "carbs": 1.9, "fat": 4.8},
+    "coconut yogurt": {"calories": 99, "unit": "kcal per 100g", "protein": 2.5, "carbs": 8.0, "fat": 7.0},
+    "plant-based milk": {"calories": 30, "unit": "kcal per 100ml", "protein": 1.0, "carbs": 3.0, "fat": 1.5},
+
+    # Grains
+    "rice": {"calories": 130, "unit": "kcal per 100g", "protein": 2.7, "carbs": 28.0, "fat": 0.3},
+    "brown rice": {"calories": 111, "unit": "kcal per 100g", "protein": 2.6, "carbs": 23.0, "fat": 0.9},
+    "white rice": {"calories": 130, "unit": "kcal per 100g", "protein": 2.7, "carbs": 28.0, "fat": 0.3},
+    "quinoa": {"calories": 120, "unit": "kcal per 100g", "protein": 4.4, "carbs": 21.0, "fat": 1.9},
+    "oats": {"calories": 389, "unit": "kcal per 100g", "protein": 16.9, "carbs": 66.0, "fat": 6.9}
+})
+
+# Curated flavor profiles served before the flavor_db.flvr / external API lookups
+LOCAL_FLAVOR_DB = freeze({
+    "lemon": {
+        "flavor_profile": {
+            "sweet": 2,
+            "sour": 8,
+            "bitter": 1,
+            "salty": 1,
+            "umami": 1,
+            "spicy": 0
+        },
+        "description": "Citrus fruit with bright, acidic flavor",
+        "aroma": "Fresh, zesty, citrusy",
+        "pairings": ["honey", "mint", "basil", "ginger", "garlic", "olive oil"],
+        "categories": ["citrus", "sour", "fresh"]
+    },
+    "garlic": {
+        "flavor_profile": {
+            "sweet": 0,
+            "sour": 1,
+            "bitter": 2,
+            "salty": 1,
+            "umami": 6,
+            "spicy": 3
+        },
+        "description": "Pungent bulb with strong savory flavor",
+        "aroma": "Strong, pungent, aromatic",
+        "pairings": ["lemon", "herbs", "onion", "tomato", "olive oil", "butter"],
+        "categories": ["allium", "savory", "aromatic"]
+    },
+    "vanilla": {
+        "flavor_profile": {
+            "sweet": 9,
+            "sour": 1,
+            "bitter": 1,
+            "salty": 0,
+            "umami": 2,
+            "spicy": 0
+        },
+        "description": "Sweet, aromatic orchid pod",
+        "aroma": "Sweet, creamy, warm, comforting",
+        "pairings": ["chocolate", "coffee", "caramel", "berries", "nuts"],
+        "categories": ["sweet", "aromatic", "comforting"]
+    },
+    "chocolate": {
+        "flavor_profile": {
+            "sweet": 8,
+            "sour": 2,
+            "bitter": 6,
+            "salty": 1,
+            "umami": 3,
+            "spicy": 1
+        },
+        "description": "Rich, sweet cacao product",
+        "aroma": "Rich, sweet, slightly bitter, comforting",
+        "pairings": ["vanilla", "coffee", "nuts", "berries", "caramel"],
+        "categories": ["sweet", "rich", "comforting"]
+    },
+    "honey": {
+        "flavor_profile": {
+            "sweet": 9,
+            "sour": 2,
+            "bitter": 1,
+            "salty": 0,
+            "umami": 1,
+            "spicy": 0
+        },
+        "description": "Natural sweet syrup from bees",
+        "aroma": "Sweet, floral, warm, golden",
+        "pairings": ["lemon", "tea", "herbs", "cheese", "nuts"],
+        "categories": ["sweet", "natural", "floral"]
+    },
+    "basil": {
+        "flavor_profile": {
+            "sweet": 1,
+            "sour": 1,
+            "bitter": 2,
+            "salty": 0,
+            "umami": 3,
+            "spicy": 0
+        },
+        "description": "Aromatic herb with sweet, peppery flavor",
+        "aroma": "Fresh, herbal, slightly sweet, peppery",
+        "pairings": ["tomato", "garlic", "lemon", "olive oil", "cheese"],
+        "categories": ["herb", "aromatic", "fresh"]
+    },
+    "ginger": {
+        "flavor_profile": {
+            "sweet": 2,
+            "sour": 2,
+            "bitter": 1,
+            "salty": 0,
+            "umami": 2,
+            "spicy": 7
+        },
+        "description": "Spicy, pungent root with zesty flavor",
+        "aroma": "Spicy, warm, zesty, slightly sweet",
+        "pairings": ["lemon", "garlic", "honey", "soy sauce", "coconut"],
+        "categories": ["spicy", "root", "zesty"]
+    },
+    "cinnamon": {
+        "flavor_profile": {
+            "sweet": 8,
+            "sour": 1,
+            "bitter": 2,
+            "salty": 0,
+            "umami": 2,
+            "spicy": 8
+        },
+        "description": "Sweet, spicy bark with warm aroma",
+        "aroma": "Sweet, spicy, warm, woody, comforting",
+        "pairings": ["apple", "coffee", "nuts", "vanilla", "chocolate"],
+        "categories": ["spice", "sweet", "warm"]
+    }
+})
+
+# Basic taste categories with example ingredients and complementary categories
+FLAVOR_CATEGORIES = freeze({
+    "sweet": {
+        "description": "Sweet flavors like sugar, honey, vanilla",
+        "ingredients": ["sugar", "honey", "vanilla", "maple syrup", "agave"],
+        "pairings": ["citrus", "nuts", "spices"]
+    },
+    "sour": {
+        "description": "Sour flavors like lemon, vinegar, yogurt",
+        "ingredients": ["lemon", "lime", "vinegar", "yogurt", "tamarind"],
+        "pairings": ["sweet", "herbs", "fatty"]
+    },
+    "salty": {
+        "description": "Salty flavors like salt, soy sauce, cheese",
+        "ingredients": ["salt", "soy sauce", "cheese", "bacon", "olives"],
+        "pairings": ["sweet", "acidic", "herbs"]
+    },
+    "bitter": {
+        "description": "Bitter flavors like coffee, dark chocolate, greens",
+        "ingredients": ["coffee", "dark chocolate", "kale", "broccoli", "grapefruit"],
+        "pairings": ["sweet", "fatty", "creamy"]
+    },
+    "umami": {
+        "description": "Umami flavors like mushrooms, soy, aged cheese",
+        "ingredients": ["mushrooms", "soy sauce", "parmesan", "tomato", "seaweed"],
+        "pairings": ["salty", "acidic", "fatty"]
+    },
+    "spicy": {
+        "description": "Spicy flavors like chili, pepper, ginger",
+        "ingredients": ["chili", "black pepper", "ginger", "wasabi", "horseradish"],
+        "pairings": ["cooling", "creamy", "sweet"]
+    }
+})
+
+# Hand-curated substitutions used when neither model has an answer
+FALLBACK_SUBSTITUTIONS = freeze({
+    "milk": [
+        {"ingredient": "almond milk", "score": 90},
+        {"ingredient": "soy milk", "score": 85},
+        {"ingredient": "coconut milk", "score": 80},
+        {"ingredient": "oat milk", "score": 82},
+        {"ingredient": "cashew milk", "score": 83}
+    ],
+    "butter": [
+        {"ingredient": "coconut oil", "score": 88},
+        {"ingredient": "olive oil", "score": 75},
+        {"ingredient": "margarine", "score": 92},
+        {"ingredient": "ghee", "score": 85},
+        {"ingredient": "avocado oil", "score": 80}
+    ],
+    "cheese": [
+        {"ingredient": "nutritional yeast", "score": 78},
+        {"ingredient": "cashew cheese", "score": 85},
+        {"ingredient": "tofu", "score": 70},
+        {"ingredient": "mozzarella", "score": 88}
+    ],
+    "eggs": [
+        {"ingredient": "flax eggs", "score": 82},
+        {"ingredient": "chia eggs", "score": 82},
+        {"ingredient": "applesauce", "score": 75},
+        {"ingredient": "banana", "score": 70},
+        {"ingredient": "silken tofu", "score": 78}
+    ],
+    "flour": [
+        {"ingredient": "almond flour", "score": 88},
+        {"ingredient": "coconut flour", "score": 80},
+        {"ingredient": "oat flour", "score": 85},
+        {"ingredient": "whole wheat flour", "score": 90},
+        {"ingredient": "gluten-free flour", "score": 82}
+    ],
+    "sugar": [
+        {"ingredient": "honey", "score": 88},
+        {"ingredient": "maple syrup", "score": 85},
+        {"ingredient": "stevia", "score": 75},
+        {"ingredient": "coconut sugar", "score": 82},
+        {"ingredient": "brown sugar", "score": 90}
+    ],
+    "dairy": [
+        {"ingredient": "almond milk", "score": 90},
+        {"ingredient": "coconut yogurt", "score": 85},
+        {"ingredient": "nutritional yeast", "score": 78},
+        {"ingredient": "dairy-free", "score": 88},
+        {"ingredient": "plant-based milk", "score": 86}
+    ]
+})
+
+# Allergens contained in common ingredients
+INGREDIENT_ALLERGENS = freeze({
+    'milk': ['dairy', 'lactose'],
+    'cheese': ['dairy', 'lactose'],
+    'butter': ['dairy', 'lactose'],
+    'cream': ['dairy', 'lactose'],
+    'yogurt': ['dairy', 'lactose'],
+    'almond': ['nuts'],
+    'walnut': ['nuts'],
+    'cashew': ['nuts'],
+    'pecan': ['nuts'],
+    'hazelnut': ['nuts'],
+    'peanut': ['nuts'],
+    'wheat': ['gluten'],
+    'flour': ['gluten'],
+    'bread': ['gluten'],
+    'pasta': ['gluten'],
+    'egg': ['egg'],
+    'eggs': ['egg'],
+    'soy': ['soy'],
+    'tofu': ['soy'],
+    'soybean': ['soy'],
+    'fish': ['fish'],
+    'salmon': ['fish'],
+    'tuna': ['fish'],
+    'shrimp': ['shellfish'],
+    'crab': ['shellfish'],
+    'lobster': ['shellfish']
+})
+
+# Allergen and taste tags used to rank NLP ingredient suggestions
+INGREDIENT_PROFILES = freeze({
+    'milk': {'allergens': ['dairy', 'lactose'], 'tastes': ['creamy', 'sweet']},
+    'almond milk': {'allergens': ['nuts'], 'tastes': ['nutty', 'creamy']},
+    'coconut milk': {'allergens': [], 'tastes': ['creamy', 'sweet', 'tropical']},
+    'soy milk': {'allergens': ['soy'], 'tastes': ['creamy', 'nutty']},
+    'butter': {'allergens': ['dairy'], 'tastes': ['creamy', 'rich', 'salty']},
+    'coconut oil': {'allergens': [], 'tastes': ['creamy', 'sweet']},
+    'olive oil': {'allergens': [], 'tastes': ['fruity', 'peppery']},
+    'cheese': {'allergens': ['dairy'], 'tastes': ['salty', 'savory', 'creamy']},
+    'nutritional yeast': {'allergens': [], 'tastes': ['savory', 'nutty', 'cheesy']},
+    'cashew cheese': {'allergens': ['nuts'], 'tastes': ['creamy', 'nutty', 'savory']},
+    'eggs': {'allergens': ['egg'], 'tastes': ['rich', 'creamy']},
+    'flax eggs': {'allergens': [], 'tastes': ['nutty', 'earthy']},
+    'chia eggs': {'allergens': [], 'tastes': ['nutty', 'earthy']},
+    'applesauce': {'allergens': [], 'tastes': ['sweet', 'fruity']},
+    'flour': {'allergens': ['gluten', 'wheat'], 'tastes': ['neutral', 'earthy']},
+    'almond flour': {'allergens': ['nuts'], 'tastes': ['nutty', 'sweet']},
+    'coconut flour': {'allergens': [], 'tastes': ['sweet', 'tropical']},
+    'sugar': {'allergens': [], 'tastes': ['sweet', 'sugary']},
+    'honey': {'allergens': [], 'tastes': ['sweet', 'floral']},
+    'maple syrup': {'allergens': [], 'tastes': ['sweet', 'woody']},
+    'stevia': {'allergens': [], 'tastes': ['sweet', 'bitter']},
+    'vanilla': {'allergens': [], 'tastes': ['sweet', 'floral', 'aromatic']},
+    'chocolate': {'allergens': [], 'tastes': ['sweet', 'bitter', 'rich']},
+    'cinnamon': {'allergens': [], 'tastes': ['sweet', 'spicy', 'warm']},
+    'garlic': {'allergens': [], 'tastes': ['pungent', 'spicy', 'savory']},
+    'lemon': {'allergens': [], 'tastes': ['sour', 'citrus', 'fresh']},
+    'basil': {'allergens': [], 'tastes': ['fresh', 'herbal', 'slightly sweet']},
+    'ginger': {'allergens': [], 'tastes': ['spicy', 'pungent', 'warm']},
+    'mint': {'allergens': [], 'tastes': ['fresh', 'cool', 'slightly sweet']}
+})
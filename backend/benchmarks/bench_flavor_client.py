@@ -0,0 +1,71 @@
+"""
+Flavor API fetches through the pooled async client, against a local stub
+
+Fires concurrent get_flavor_data misses at a slow stub upstream while a
+heartbeat task measures event-loop lag, to show a slow upstream does not block
+other requests. Reports upstream connections opened versus requests made, and
+how many misses single-flight collapsed when they share ingredients. Run from
+the backend directory:
+
+    python -m benchmarks.bench_flavor_client [--requests 200] [--distinct 20] [--delay 0.2]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.stub_flavor_api import start_stub_server
+
+async def heartbeat(stop, interval=0.01):
+    """Largest delay seen between scheduled wake-ups of the event loop"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+async def run(args):
+    from services.flavordb_service import get_flavor_data, flavor_fetches
+    from services.http_client import http_client
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(heartbeat(stop))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(get_flavor_data(f"bench ingredient {i % args.distinct}") for i in range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    worst_lag = await lag
+    await http_client.aclose()
+    ok = sum("error" not in result for result in results)
+    return ok, elapsed, worst_lag, flavor_fetches.stats()
+
+def main():
+    parser = argparse.ArgumentParser(description="Pooled flavor API client benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--distinct", type=int, help="distinct ingredients requested (default: all distinct)")
+    parser.add_argument("--delay", type=float, default=0.2, help="stub upstream latency in seconds")
+    args = parser.parse_args()
+    args.distinct = args.distinct or args.requests
+
+    server = start_stub_server(delay=args.delay)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Configure before the app modules are imported
+        os.environ["FLAVOR_API_BASE_URL"] = server.base_url
+        os.environ["FLAVOR_CACHE_PATH"] = os.path.join(tmp, "flavor_cache.sqlite")
+
+        ok, elapsed, worst_lag, flights = asyncio.run(run(args))
+
+    print(f"{ok}/{args.requests} flavor fetches in {elapsed:.2f}s "
+          f"(upstream delay {args.delay}s): {server.counts['requests']} upstream requests "
+          f"over {server.counts['connections']} connections")
+    print(f"worst event-loop lag during the fetches: {worst_lag * 1000:.1f} ms")
+    print(f"single-flight: {flights['flights']} flights for {flights['calls']} misses "
+          f"({flights['collapsed']} collapsed, max {flights['max_callers_per_flight']} callers per flight)")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
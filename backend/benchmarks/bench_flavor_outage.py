@@ -0,0 +1,73 @@
+"""
+/flavor latency while the upstream is down, against a local stub
+
+Warms the persistent cache, lets its entries expire, then makes the stub slow
+and failing. Requests for cached ingredients should be served stale at once;
+requests for new ingredients should fail fast once the circuit breaker opens,
+instead of each waiting out the upstream. Run from the backend directory:
+
+    python -m benchmarks.bench_flavor_outage [--requests 300] [--delay 1.0]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from benchmarks.stub_flavor_api import start_stub_server
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)]
+
+async def run(args, server):
+    from services.flavordb_service import get_flavor_data, flavor_breaker, revalidation_stats
+    from services.http_client import http_client
+
+    cached = [f"cached ingredient {i}" for i in range(20)]
+    await asyncio.gather(*(get_flavor_data(name) for name in cached))
+    await asyncio.sleep(0.2)  # let the short TTL expire
+
+    server.delay, server.fail = args.delay, True
+
+    async def timed(name):
+        start = time.perf_counter()
+        result = await get_flavor_data(name)
+        return time.perf_counter() - start, "error" not in result
+
+    latencies = []
+    served = 0
+    for wave in range(args.requests // 20):
+        names = [cached[i] if i % 2 else f"new ingredient {wave}-{i}" for i in range(20)]
+        for latency, ok in await asyncio.gather(*(timed(name) for name in names)):
+            latencies.append(latency)
+            served += ok
+
+    await http_client.aclose()
+    return latencies, served, flavor_breaker.stats(), dict(revalidation_stats)
+
+def main():
+    parser = argparse.ArgumentParser(description="Flavor API outage benchmark")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--delay", type=float, default=1.0, help="stub latency during the outage in seconds")
+    args = parser.parse_args()
+
+    server = start_stub_server()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Configure before the app modules are imported
+        os.environ["FLAVOR_API_BASE_URL"] = server.base_url
+        os.environ["FLAVOR_CACHE_PATH"] = os.path.join(tmp, "flavor_cache.sqlite")
+        os.environ["FLAVOR_CACHE_TTL"] = "0.1"
+
+        latencies, served, breaker, revalidation = asyncio.run(run(args, server))
+
+    print(f"{len(latencies)} requests during the outage, {served} served (stale copies)")
+    print(f"latency p50 {percentile(latencies, 0.5) * 1000:.1f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms")
+    print(f"upstream requests: {server.counts['requests']}, breaker: {breaker['state']} "
+          f"(opened {breaker['opened']}x, rejected {breaker['rejected']})")
+    print(f"stale-while-revalidate: {revalidation}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Flavor database load time and memory: pickle vs the memory-mapped record file
+
+Builds a synthetic flavor database shaped like ml/flavor_database.py, writes
+it in both formats, then opens each in a fresh interpreter (as a worker does)
+and reports load time, lookup time and memory. Private (anonymous) RSS is
+what every worker pays separately; file-backed RSS is page cache shared by
+all workers mapping the same file. Run from the backend directory (Linux):
+
+    python -m benchmarks.bench_flavor_records [--records N] [--lookups N]
+"""
+import argparse
+import json
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+
+from ml.flavor_database import flavor_data
+from ml.flavor_records import write_record_file
+
+PROBE = """
+import json, pickle, random, sys, time
+
+def rss():
+    fields = dict(line.split(":", 1) for line in open("/proc/self/status"))
+    return {{key: int(fields[key].split()[0]) / 1024 for key in ("RssAnon", "RssFile")}}
+
+sys.path.insert(0, {backend!r})
+from ml.flavor_records import FlavorRecordFile
+random.seed(0)
+before = rss()
+start = time.perf_counter()
+if {fmt!r} == "pickle":
+    with open({path!r}, "rb") as f:
+        db = pickle.load(f)
+else:
+    db = FlavorRecordFile({path!r})
+loaded = time.perf_counter()
+after_load = rss()
+names = [f"ingredient {{random.randrange({records})}}" for _ in range({lookups})]
+start_lookup = time.perf_counter()
+for name in names:
+    db[name]["taste_profile"]
+done = time.perf_counter()
+after_lookups = rss()
+print(json.dumps({{
+    "load_ms": (loaded - start) * 1000,
+    "lookup_us": (done - start_lookup) / {lookups} * 1e6,
+    "anon_mb_load": after_load["RssAnon"] - before["RssAnon"],
+    "anon_mb_lookups": after_lookups["RssAnon"] - before["RssAnon"],
+    "file_mb_lookups": after_lookups["RssFile"] - before["RssFile"],
+}}))
+"""
+
+def synthetic_records(count, seed=0):
+    rng = random.Random(seed)
+    templates = list(flavor_data.values())
+    records = {}
+    for i in range(count):
+        record = json.loads(json.dumps(rng.choice(templates)))
+        record["taste_profile"] = {key: rng.randint(0, 10) for key in record["taste_profile"]}
+        records[f"ingredient {i}"] = record
+    return records
+
+def probe(fmt, path, records, lookups):
+    code = PROBE.format(fmt=fmt, path=path, records=records, lookups=lookups,
+                        backend=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+def main():
+    parser = argparse.ArgumentParser(description="Flavor database format benchmark")
+    parser.add_argument("--records", type=int, default=200000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    records = synthetic_records(args.records)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {"pickle": os.path.join(tmp, "flavor_db.pkl"), "records": os.path.join(tmp, "flavor_db.flvr")}
+        with open(paths["pickle"], "wb") as f:
+            pickle.dump(records, f)
+        write_record_file(paths["records"], records)
+        del records
+
+        print(f"{args.records} records, {args.lookups} random lookups per worker")
+        print(f"{'format':<8} {'size MB':>8} {'load ms':>9} {'lookup us':>10} "
+              f"{'private MB (load)':>18} {'private MB (after)':>19} {'shared MB':>10}")
+        for fmt, path in paths.items():
+            result = probe(fmt, path, args.records, args.lookups)
+            print(f"{fmt:<8} {os.path.getsize(path) / 2**20:>8.1f} {result['load_ms']:>9.1f} "
+                  f"{result['lookup_us']:>10.1f} {result['anon_mb_load']:>18.1f} "
+                  f"{result['anon_mb_lookups']:>19.1f} {result['file_mb_lookups']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
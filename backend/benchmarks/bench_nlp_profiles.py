@@ -0,0 +1,80 @@
+"""
+NLP throughput and memory per pipeline profile
+
+Each profile is loaded in a fresh interpreter, as a worker would load it, and
+parses the same synthetic queries one call at a time and through nlp.pipe.
+Reports load time, docs/sec and resident memory per worker. Profiles whose
+model is not installed are reported as unavailable. Run from the backend
+directory (Linux):
+
+    python -m benchmarks.bench_nlp_profiles [--queries N] [--profiles full lemmas lexical]
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+from ml.nlp_engine import PIPELINE_PROFILES
+
+PROBE = """
+import json, random, time
+
+def rss_mb():
+    fields = dict(line.split(":", 1) for line in open("/proc/self/status"))
+    return int(fields["VmRSS"].split()[0]) / 1024
+
+before = rss_mb()
+start = time.perf_counter()
+from ml.nlp_engine import NLPEngine
+engine = NLPEngine({profile!r})
+loaded = time.perf_counter()
+
+rng = random.Random(0)
+words = ["allergic", "to", "nuts", "dairy", "soy sauce", "and", "i", "love", "sweet", "creamy",
+         "spicy", "gluten-free", "vegan", "dishes", "with", "fresh", "herbs", "no", "eggs", "please"]
+queries = [" ".join(rng.choice(words) for _ in range(rng.randint(6, 20))) for _ in range({queries})]
+
+t = time.perf_counter()
+for query in queries[:{single}]:
+    engine.analyze_dietary_preferences(query)
+single = {single} / (time.perf_counter() - t)
+
+t = time.perf_counter()
+engine.analyze_dietary_preferences_batch(queries)
+piped = len(queries) / (time.perf_counter() - t)
+
+print(json.dumps({{
+    "load_seconds": loaded - start,
+    "rss_mb": rss_mb(),
+    "model_mb": rss_mb() - before,
+    "single_docs_per_sec": single,
+    "pipe_docs_per_sec": piped,
+    "components": engine.nlp.pipe_names,
+}}))
+"""
+
+def probe(profile, queries):
+    code = PROBE.format(profile=profile, queries=queries, single=min(queries, 1000))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if out.returncode != 0:
+        return None
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="NLP pipeline profile benchmark")
+    parser.add_argument("--queries", type=int, default=5000)
+    parser.add_argument("--profiles", nargs="+", default=list(PIPELINE_PROFILES), choices=list(PIPELINE_PROFILES))
+    args = parser.parse_args()
+
+    print(f"{'profile':<8} {'load s':>7} {'RSS MB':>7} {'docs/s single':>14} {'docs/s pipe':>12}  components")
+    for profile in args.profiles:
+        result = probe(profile, args.queries)
+        if result is None:
+            print(f"{profile:<8} unavailable (is {'en_core_web_sm' if PIPELINE_PROFILES[profile] is not None else 'spaCy'} installed?)")
+            continue
+        print(f"{profile:<8} {result['load_seconds']:>7.2f} {result['rss_mb']:>7.1f} "
+              f"{result['single_docs_per_sec']:>14,.0f} {result['pipe_docs_per_sec']:>12,.0f}  "
+              f"{', '.join(result['components']) or 'tokenizer only'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+NLP throughput and event-loop lag with and without worker processes
+
+For each worker count a fresh interpreter configures NLP_WORKERS, fires
+concurrent parse_user_query calls through the micro-batcher from the event
+loop, and reports docs/sec plus the worst event-loop lag seen by a heartbeat
+task meanwhile. 0 workers parses in the server process, as before. The
+lexical profile needs no trained model; try --profile lemmas where
+en_core_web_sm is installed. Run from the backend directory:
+
+    python -m benchmarks.bench_nlp_workers [--queries N] [--workers 0 1 2 4] [--profile lexical]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+PROBE = """
+import asyncio, json, random, time
+from services.nlp_service import parse_user_query, nlp_pool, close_nlp
+
+async def heartbeat(stop, interval=0.01):
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+async def main():
+    rng = random.Random(0)
+    words = ["allergic", "to", "nuts", "dairy", "soy sauce", "and", "i", "love", "sweet", "creamy",
+             "spicy", "gluten-free", "vegan", "dishes", "with", "fresh", "herbs", "no", "eggs", "please"]
+    queries = [" ".join(rng.choice(words) for _ in range(rng.randint(6, 20))) for _ in range({queries})]
+    if nlp_pool is not None:
+        nlp_pool.run([("warm up", None)] * {workers})
+    else:
+        await parse_user_query("warm up")
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(heartbeat(stop))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(parse_user_query(query) for query in queries))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return {{
+        "docs_per_sec": len(queries) / elapsed,
+        "worst_lag_ms": await lag * 1000,
+        "errors": sum("error" in result for result in results),
+    }}
+
+result = asyncio.run(main())
+close_nlp()
+print(json.dumps(result))
+"""
+
+def probe(workers, queries, profile):
+    env = {**os.environ, "NLP_WORKERS": str(workers), "NLP_PROFILE": profile, "NLP_QUEUE_SIZE": str(queries)}
+    code = PROBE.format(queries=queries, workers=workers)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    if out.returncode != 0:
+        return None
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="NLP worker process benchmark")
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--profile", default="lexical")
+    args = parser.parse_args()
+
+    print(f"{args.queries} concurrent queries, {args.profile} profile, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7} {'docs/s':>9} {'worst loop lag ms':>18} {'errors':>7}")
+    for workers in args.workers:
+        result = probe(workers, args.queries, args.profile)
+        if result is None:
+            print(f"{workers:>7} failed (is the {args.profile} profile's model installed?)")
+            continue
+        print(f"{workers:>7} {result['docs_per_sec']:>9,.0f} {result['worst_lag_ms']:>18.1f} {result['errors']:>7}")
+
+if __name__ == "__main__":
+    main()
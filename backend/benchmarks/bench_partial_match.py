@@ -0,0 +1,55 @@
+"""
+Partial calorie matching: linear scan vs SubstringIndex on a USDA-sized table
+
+Builds a synthetic table of multi-word ingredient names and times collecting
+every partial-match candidate, which ranking the best match requires. Run from the backend directory:
+
+    python -m benchmarks.bench_partial_match [--rows N]
+"""
+import argparse
+import random
+import time
+
+from app.reference_data import CALORIE_DATABASE
+from services.substring_index import SubstringIndex
+
+MODIFIERS = ["raw", "cooked", "boiled", "fried", "dried", "frozen", "canned", "organic",
+             "unsweetened", "low fat", "whole", "ground", "smoked", "roasted", "fresh"]
+
+def synthetic_keys(rows, seed=0):
+    rng = random.Random(seed)
+    bases = list(CALORIE_DATABASE)
+    keys = dict.fromkeys(bases)
+    while len(keys) < rows:
+        words = rng.sample(MODIFIERS, rng.randint(1, 3))
+        keys[f"{rng.choice(bases)} {' '.join(words)} {rng.randint(1, 99999)}"] = None
+    return list(keys)
+
+def linear_scan(keys, query):
+    """Every candidate a ranked match has to consider, found the old way"""
+    return [key for key in keys if query in key or key in query]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300_000)
+    args = parser.parse_args()
+
+    keys = synthetic_keys(args.rows)
+    start = time.perf_counter()
+    index = SubstringIndex(keys)
+    print(f"indexed {len(keys)} keys in {time.perf_counter() - start:.2f}s")
+
+    queries = ["unsweetened almond milk drink", "coconut flour blend", "quinoa salad",
+               "smoked paprika", "brown rice", "zzz unknown", "oats"]
+    print(f"{'query':<32}{'scan ms':>10}{'index ms':>10}  best match")
+    for query in queries:
+        start = time.perf_counter()
+        linear_scan(keys, query)
+        scan_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        matches = index.search(query, limit=1)
+        index_ms = (time.perf_counter() - start) * 1000
+        print(f"{query:<32}{scan_ms:>10.2f}{index_ms:>10.2f}  {matches[0][0] if matches else '-'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Per-call allocation micro-benchmark for reference-data lookups
+
+"before" rebuilds the table on every call, the way the services used to
+declare their dict literals inside the request function; "after" is the
+current service call reading the shared frozen table. Byte counts come from
+tracemalloc and understate "before", since CPython recycles small dicts from
+a free list without a traced allocation. Run from the backend directory:
+
+    python -m benchmarks.bench_reference_allocs
+"""
+import timeit
+import tracemalloc
+
+from app.reference_data import (
+    CALORIE_DATABASE, LOCAL_FLAVOR_DB, FLAVOR_CATEGORIES,
+    FALLBACK_SUBSTITUTIONS, INGREDIENT_ALLERGENS, INGREDIENT_PROFILES, thaw,
+)
+
+def peak_bytes(fn, repeat=50):
+    """Largest transient allocation observed across `repeat` calls"""
+    fn()  # warm up caches, interned strings and lazy imports
+    worst = 0
+    for _ in range(repeat):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        worst = max(worst, peak - base)
+    return worst
+
+def ns_per_call(fn, number=2000):
+    return timeit.timeit(fn, number=number) / number * 1e9
+
+def cases():
+    from services.calorie_service import get_calorie_data
+    from services.flavordb_service import get_flavor_categories
+    from services.substitution import get_fallback_substitutions
+
+    yield ("calorie lookup",
+           lambda: thaw(CALORIE_DATABASE)["milk"],
+           lambda: get_calorie_data("milk"))
+    yield ("local flavor lookup",
+           lambda: thaw(LOCAL_FLAVOR_DB)["lemon"],
+           lambda: LOCAL_FLAVOR_DB["lemon"])
+    yield ("flavor categories",
+           lambda: thaw(FLAVOR_CATEGORIES),
+           get_flavor_categories)
+    yield ("fallback substitutions",
+           lambda: thaw(FALLBACK_SUBSTITUTIONS).get("milk"),
+           lambda: get_fallback_substitutions("milk"))
+    yield ("allergen lookup",
+           lambda: thaw(INGREDIENT_ALLERGENS).get("milk", []),
+           lambda: INGREDIENT_ALLERGENS.get("milk", ()))
+    yield ("ingredient profiles",
+           lambda: thaw(INGREDIENT_PROFILES),
+           lambda: INGREDIENT_PROFILES)
+
+def main():
+    rows = list(cases())
+    print(f"{'case':<26}{'before B':>10}{'after B':>10}{'before ns':>12}{'after ns':>12}")
+    timings = [(ns_per_call(before), ns_per_call(after)) for _, before, after in rows]
+    tracemalloc.start()
+    for (name, before, after), (before_ns, after_ns) in zip(rows, timings):
+        print(f"{name:<26}{peak_bytes(before):>10}{peak_bytes(after):>10}{before_ns:>12.0f}{after_ns:>12.0f}")
+    tracemalloc.stop()
+
+if __name__ == "__main__":
+    main()
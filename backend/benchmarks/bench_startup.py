@@ -0,0 +1,57 @@
+"""
+Cold-start benchmark for the substitution stack
+
+Each target is imported in a fresh interpreter, the way an autoscaled worker
+starts, and timed separately from the first request that has to load the
+model. Run from the backend directory:
+
+    python -m benchmarks.bench_startup [--runs N]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("pandas", "sklearn", "scipy", "joblib")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+{first_call}
+done = time.perf_counter()
+print(json.dumps({{
+    "import_seconds": imported - start,
+    "first_call_seconds": done - imported,
+    "heavy_modules": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+TARGETS = {
+    "services.substitution": "services.substitution.get_substitution('milk')",
+    "ml.simple_model": "ml.simple_model.predict_substitute('milk')",
+    "ml.ml_engine": "pass",
+}
+
+def run_probe(module, first_call):
+    code = PROBE.format(module=module, first_call=first_call, heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'target':<24}{'import ms':>12}{'first call ms':>16}  heavy modules after import+call")
+    for module, first_call in TARGETS.items():
+        samples = [run_probe(module, first_call) for _ in range(args.runs)]
+        import_ms = statistics.median(s["import_seconds"] for s in samples) * 1000
+        call_ms = statistics.median(s["first_call_seconds"] for s in samples) * 1000
+        heavy = ", ".join(samples[-1]["heavy_modules"]) or "-"
+        print(f"{module:<24}{import_ms:>12.1f}{call_ms:>16.1f}  {heavy}")
+
+if __name__ == "__main__":
+    main()
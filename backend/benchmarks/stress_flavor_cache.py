@@ -0,0 +1,117 @@
+"""
+Stress test for the persistent flavor cache under concurrent writers
+
+Spawns several processes, each with several threads, that write their own keys
+plus a set of keys shared by every writer, while reading back as they go. Each
+value carries a checksum of its payload. Afterwards every key must be present,
+every value must verify, and SQLite's integrity check must pass. Run from the
+backend directory:
+
+    python -m benchmarks.stress_flavor_cache [--processes 8] [--threads 4] [--keys 200]
+
+Exits non-zero if any entry is lost or corrupted.
+"""
+import argparse
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+from services.flavor_cache import PersistentFlavorCache
+
+SHARED_KEYS = 50
+
+def make_value(writer, key):
+    payload = {"writer": writer, "key": key, "flavors": [f"{key}-note-{i}" for i in range(20)]}
+    return {"payload": payload, "checksum": hashlib.sha1(repr(payload).encode()).hexdigest()}
+
+def verify_value(value):
+    return (
+        isinstance(value, dict)
+        and hashlib.sha1(repr(value.get("payload")).encode()).hexdigest() == value.get("checksum")
+    )
+
+def write_keys(path, process, thread, keys, errors):
+    # No eviction and no expiry: every write must survive
+    cache = PersistentFlavorCache(path, ttl=3600, max_entries=0)
+    writer = f"p{process}-t{thread}"
+    for i in range(keys):
+        for key in (f"{writer}-{i}", f"shared-{i % SHARED_KEYS}"):
+            cache.put(key, make_value(writer, key))
+            entry = cache.get_entry(key)
+            if entry is None or not verify_value(entry[0]):
+                errors.append(f"{writer}: bad read-back of {key}")
+
+def run_process(path, process, threads, keys):
+    errors = []
+    workers = [
+        threading.Thread(target=write_keys, args=(path, process, t, keys, errors))
+        for t in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    for error in errors:
+        print(error)
+    sys.exit(1 if errors else 0)
+
+def check(path, processes, threads, keys):
+    cache = PersistentFlavorCache(path, max_entries=0)
+    failures = []
+
+    expected = [f"p{p}-t{t}-{i}" for p in range(processes) for t in range(threads) for i in range(keys)]
+    expected += [f"shared-{i}" for i in range(min(keys, SHARED_KEYS))]
+    for key in expected:
+        entry = cache.get_entry(key)
+        value = entry[0] if entry else None
+        if value is None:
+            failures.append(f"lost: {key}")
+        elif not verify_value(value) or value["payload"]["key"] != key:
+            failures.append(f"corrupted: {key}")
+
+    with sqlite3.connect(path) as conn:
+        integrity = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    if integrity != "ok":
+        failures.append(f"integrity_check: {integrity}")
+    return expected, failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--keys", type=int, default=200, help="keys written per thread")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "flavor_cache.sqlite")
+
+        start = time.perf_counter()
+        procs = [
+            multiprocessing.Process(target=run_process, args=(path, p, args.threads, args.keys))
+            for p in range(args.processes)
+        ]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+        elapsed = time.perf_counter() - start
+
+        writes = args.processes * args.threads * args.keys * 2
+        print(f"{args.processes} processes x {args.threads} threads: "
+              f"{writes} writes in {elapsed:.2f}s ({writes / elapsed:,.0f} writes/s)")
+
+        expected, failures = check(path, args.processes, args.threads, args.keys)
+        failed_writers = sum(proc.exitcode != 0 for proc in procs)
+        for failure in failures[:20]:
+            print(failure)
+        print(f"checked {len(expected)} keys: {len(failures)} failures, {failed_writers} failed writers")
+        if failures or failed_writers:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
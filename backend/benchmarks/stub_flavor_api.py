@@ -0,0 +1,94 @@
+"""
+Local stand-in for the external flavor API
+
+Serves GET /ingredients/flavor/<category>?page=&limit= with a fixed catalogue,
+an optional artificial delay and HTTP/1.1 keep-alive, and counts requests and
+TCP connections so pooling can be observed. Setting `fail` makes every
+request answer 503 to simulate an outage. Run from the backend directory:
+
+    python -m benchmarks.stub_flavor_api [--port 8765] [--delay 0.2]
+    FLAVOR_API_BASE_URL=http://127.0.0.1:8765 python run.py
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+CATALOGUE = [
+    {"id": i, "name": f"ingredient {i}", "flavors": ["earthy", "spicy", "sweet"][i % 3:i % 3 + 1]}
+    for i in range(1, 501)
+]
+
+class StubFlavorServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, delay=0.0, fail=False):
+        super().__init__(address, StubFlavorHandler)
+        self.delay = delay
+        self.fail = fail
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "connections": 0}
+
+    def count(self, name):
+        with self.lock:
+            self.counts[name] += 1
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+class StubFlavorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.count("connections")
+
+    def do_GET(self):
+        self.server.count("requests")
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        if self.server.fail:
+            self._send(503, {"error": "unavailable"})
+            return
+
+        url = urlsplit(self.path)
+        if not url.path.startswith("/ingredients/flavor/"):
+            self._send(404, {"error": "not found"})
+            return
+        query = parse_qs(url.query)
+        page = max(int(query.get("page", ["1"])[0]), 1)
+        limit = max(int(query.get("limit", ["50"])[0]), 1)
+        items = CATALOGUE[(page - 1) * limit:page * limit]
+        self._send(200, {"page": page, "limit": limit, "total": len(CATALOGUE), "data": items})
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_stub_server(port=0, delay=0.0, fail=False):
+    """Start a stub server on a background thread and return it"""
+    server = StubFlavorServer(("127.0.0.1", port), delay, fail)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub flavor API")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds to wait before each response")
+    parser.add_argument("--fail", action="store_true", help="answer every request with 503")
+    args = parser.parse_args()
+
+    server = StubFlavorServer(("127.0.0.1", args.port), args.delay, args.fail)
+    print(f"Stub flavor API on {server.base_url}")
+    server.serve_forever()
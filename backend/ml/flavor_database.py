@@ -1,5 +1,5 @@
-import pickle
 import os
+from ml.flavor_records import FlavorRecordFile, write_record_file, FLAVOR_RECORDS_PATH
 
 # Create comprehensive flavor database
 flavor_data = {
@@ -167,19 +167,15 @@ flavor_data = {
 
 # Save the flavor database
 def save_flavor_database():
-    """Save the flavor database to a pickle file"""
-    model_path = os.path.join(os.path.dirname(__file__), "flavor_db.pkl")
-    with open(model_path, 'wb') as f:
-        pickle.dump(flavor_data, f)
-    print(f"Flavor database saved to {model_path}")
+    """Save the flavor database as a memory-mappable record file"""
+    write_record_file(FLAVOR_RECORDS_PATH, flavor_data)
+    print(f"Flavor database saved to {FLAVOR_RECORDS_PATH}")
 
 # Load the flavor database
 def load_flavor_database():
-    """Load the flavor database from a pickle file"""
-    model_path = os.path.join(os.path.dirname(__file__), "flavor_db.pkl")
-    if os.path.exists(model_path):
-        with open(model_path, 'rb') as f:
-            return pickle.load(f)
+    """Open the flavor database record file; records are decoded on access"""
+    if os.path.exists(FLAVOR_RECORDS_PATH):
+        return FlavorRecordFile(FLAVOR_RECORDS_PATH)
     return flavor_data
 
 # Create and save the database
@@ -0,0 +1,177 @@
+import bisect
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+import numpy as np
+
+FLAVOR_RECORDS_PATH = os.path.join(os.path.dirname(__file__), "flavor_db.flvr")
+
+MAGIC = b"FLAVORDB"
+VERSION = 1
+# magic, version, record count, then absolute offsets of the key blob, key index and record index
+HEADER = struct.Struct("<8sIIQQQ")
+
+def _align(offset):
+    return offset + (-offset % 8)
+
+class FlavorRecordFile(Mapping):
+    """
+    Read-only flavor database memory-mapped from an indexed record file
+
+    Layout (little-endian):
+        header        magic, version, count, key blob / key index / record index offsets
+        records       JSON documents, one per ingredient, back to back
+        key blob      UTF-8 ingredient names, sorted by their bytes
+        key index     uint64[count + 1] offsets of each name in the key blob
+        record index  uint64[count + 1] offsets of each record after the header
+
+    Opening the file only maps it and reads the header; names are found by
+    binary search over the mapped index and a record is decoded only when it
+    is looked up. Every worker maps the same pages from the OS page cache, and
+    records are plain JSON, so opening a file never executes code from it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count, keys_at, key_index_at, record_index_at = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a flavor record file (version {VERSION}): {path}")
+        self._count = count
+        self._keys_at = keys_at
+        self._key_offsets = np.frombuffer(self._mm, dtype="<u8", count=count + 1, offset=key_index_at)
+        self._record_offsets = np.frombuffer(self._mm, dtype="<u8", count=count + 1, offset=record_index_at)
+        self._keys = _KeyView(self)
+
+    def _key_bytes(self, i):
+        start = self._keys_at + int(self._key_offsets[i])
+        return self._mm[start:self._keys_at + int(self._key_offsets[i + 1])]
+
+    def _position(self, key):
+        if not isinstance(key, str):
+            return None
+        encoded = key.encode("utf-8")
+        i = bisect.bisect_left(self._keys, encoded)
+        if i < self._count and self._keys[i] == encoded:
+            return i
+        return None
+
+    def _record(self, i):
+        start = HEADER.size + int(self._record_offsets[i])
+        return json.loads(self._mm[start:HEADER.size + int(self._record_offsets[i + 1])])
+
+    def __getitem__(self, key):
+        i = self._position(key)
+        if i is None:
+            raise KeyError(key)
+        return self._record(i)
+
+    def __contains__(self, key):
+        return self._position(key) is not None
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return (self._keys[i].decode("utf-8") for i in range(self._count))
+
+class _KeyView:
+    """Sorted key bytes as a sequence, so bisect can search the mapped index"""
+
+    def __init__(self, records):
+        self._records = records
+
+    def __len__(self):
+        return self._records._count
+
+    def __getitem__(self, i):
+        return self._records._key_bytes(i)
+
+def write_record_file(path, records):
+    """
+    Write a {name: record} mapping as a record file and atomically swap it into place
+
+    Processes that already have the old file mapped keep reading it.
+    """
+    items = sorted(((name.encode("utf-8"), record) for name, record in records.items()), key=lambda item: item[0])
+
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+
+        record_offsets = [0]
+        for _, record in items:
+            f.write(json.dumps(record, separators=(",", ":"), sort_keys=True).encode("utf-8"))
+            record_offsets.append(f.tell() - HEADER.size)
+
+        keys_at = f.tell()
+        key_offsets = [0]
+        for name, _ in items:
+            f.write(name)
+            key_offsets.append(f.tell() - keys_at)
+
+        key_index_at = _align(f.tell())
+        f.write(b"\0" * (key_index_at - f.tell()))
+        f.write(np.asarray(key_offsets, dtype="<u8").tobytes())
+        record_index_at = f.tell()
+        f.write(np.asarray(record_offsets, dtype="<u8").tobytes())
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(items), keys_at, key_index_at, record_index_at))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+    return len(items)
+
+def _read_json_records(input_path):
+    """{name: record} from a JSON object or JSONL lines of {"name": ..., "record": ...}"""
+    with open(input_path, encoding="utf-8") as f:
+        if input_path.endswith((".jsonl", ".ndjson")):
+            return {entry["name"]: entry["record"] for entry in map(json.loads, f) if entry}
+        return json.load(f)
+
+# Convert the flavor database between formats
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert the flavor database to and from the indexed record format")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="write the built-in flavor database (ml/flavor_database.py)")
+    build.add_argument("--output", default=FLAVOR_RECORDS_PATH)
+
+    from_pickle = commands.add_parser("from-pickle", help="convert a trusted legacy flavor_db.pkl")
+    from_pickle.add_argument("input")
+    from_pickle.add_argument("--output", default=FLAVOR_RECORDS_PATH)
+
+    import_json = commands.add_parser("import", help="import a JSON object or JSONL {name, record} file")
+    import_json.add_argument("input")
+    import_json.add_argument("--output", default=FLAVOR_RECORDS_PATH)
+
+    export_json = commands.add_parser("export", help="export a record file as a JSON object")
+    export_json.add_argument("output")
+    export_json.add_argument("--input", default=FLAVOR_RECORDS_PATH)
+
+    args = parser.parse_args()
+
+    if args.command == "export":
+        records = FlavorRecordFile(args.input)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(dict(records.items()), f, indent=2)
+        print(f"Exported {len(records)} records to {args.output}")
+    else:
+        if args.command == "build":
+            from ml.flavor_database import flavor_data as records
+        elif args.command == "from-pickle":
+            import pickle
+            with open(args.input, "rb") as f:
+                records = pickle.load(f)
+        else:
+            records = _read_json_records(args.input)
+        count = write_record_file(args.output, records)
+        print(f"Flavor record file written to {args.output}: {count} records")
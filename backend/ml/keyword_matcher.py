@@ -0,0 +1,79 @@
+from typing import Callable, Dict, Iterable, List, Tuple
+
+class KeywordMatcher:
+    """
+    Single-pass matcher for keyword phrases over a token sequence
+
+    Phrases are tokenized with the same tokenizer as the queries and stored in
+    a token trie, so multi-word ("soy sauce") and hyphenated ("gluten-free",
+    split by spaCy into gluten / - / free) terms match as units. A hyphenated
+    phrase also matches its spaced form ("gluten free"). A token matches a
+    pattern token through either its text or its lemma.
+
+    `find` starts one trie walk per token, each at most as deep as the longest
+    phrase, so a query costs time linear in its length. Within a category the
+    longest match wins and matches never overlap, except in `overlapping`
+    categories, which report every match: there "soy milk" is found along with
+    the "soy" and "milk" inside it. Matches in different categories are
+    independent, so an allergen inside a dietary phrase still counts.
+    """
+
+    def __init__(self, tokenize: Callable[[str], List[str]], overlapping: Iterable[str] = ()):
+        self._tokenize = tokenize
+        self.overlapping = frozenset(overlapping)
+        self._root = {}
+        self.max_length = 0
+
+    @classmethod
+    def build(cls, phrases: Dict[Tuple[str, str], Iterable[str]], tokenize: Callable[[str], List[str]],
+              overlapping: Iterable[str] = ()):
+        """Compile {(category, value): phrases} into one matcher"""
+        matcher = cls(tokenize, overlapping)
+        for (category, value), terms in phrases.items():
+            for term in terms:
+                matcher.add(category, value, term)
+        return matcher
+
+    def add(self, category: str, value: str, phrase: str):
+        """Report `value` under `category` wherever `phrase` occurs"""
+        phrase = phrase.lower()
+        for variant in {phrase, phrase.replace("-", " ")}:
+            tokens = [token for token in self._tokenize(variant) if token.strip()]
+            if not tokens:
+                continue
+            node = self._root
+            for token in tokens:
+                node = node.setdefault(token, {})
+            node.setdefault(None, {})[category] = value
+            self.max_length = max(self.max_length, len(tokens))
+
+    def find(self, tokens: List[str], lemmas: List[str]) -> List[Tuple[str, str, int, int]]:
+        """(category, value, start, end) for every match, in query order"""
+        matches = []
+        covered = {}
+        for start in range(len(tokens)):
+            # Longest phrase per category starting at this token
+            longest = {}
+            reported = set()
+            nodes = [self._root]
+            for end in range(start, min(len(tokens), start + self.max_length)):
+                keys = (tokens[end],) if tokens[end] == lemmas[end] else (tokens[end], lemmas[end])
+                nodes = [child for node in nodes for key in keys if (child := node.get(key)) is not None]
+                if not nodes:
+                    break
+                for node in nodes:
+                    for category, value in node.get(None, {}).items():
+                        if category in self.overlapping:
+                            # One match per span, the text match when both text and lemma match
+                            if (category, end) not in reported:
+                                reported.add((category, end))
+                                matches.append((category, value, start, end + 1))
+                            continue
+                        # Text matches come first, so they win over lemma matches of the same length
+                        if longest.get(category, (None, 0))[1] <= end:
+                            longest[category] = (value, end + 1)
+            for category, (value, end) in longest.items():
+                if start >= covered.get(category, 0):
+                    matches.append((category, value, start, end))
+                    covered[category] = end
+        return matches
@@ -1,44 +1,102 @@
-import joblib
+import importlib.util
 import os
+from ml.model_registry import ModelRegistry
+from ml.neighbor_index import NeighborIndex, NEIGHBORS_DIR, file_fingerprint, rank_neighbors
 
-try:
-    from sklearn.metrics.pairwise import cosine_similarity
-    SKLEARN_AVAILABLE = True
-except ImportError as e:
-    print(f"Warning: sklearn not available: {e}")
-    SKLEARN_AVAILABLE = False
+# sklearn is only imported when the model is actually loaded, keeping worker startup light
+SKLEARN_AVAILABLE = importlib.util.find_spec("sklearn") is not None
+if not SKLEARN_AVAILABLE:
+    print("Warning: sklearn not available")
 
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "flavor_model.pkl")
+NEIGHBOR_INDEX_DIR = os.path.join(NEIGHBORS_DIR, "flavor_model")
+
+def _load_model(path):
+    """Load the model and the precomputed neighbour index built from this exact file"""
+    import joblib
+    
+    model_data = dict(joblib.load(path))
+    
+    # Resolve names to matrix rows once per load instead of scanning the DataFrame per request
+    names = [str(name) for name in model_data["dataframe"]["ingredient"]]
+    rows_by_name = {}
+    for i, name in enumerate(names):
+        rows_by_name.setdefault(name, []).append(i)
+    model_data["names"] = names
+    model_data["rows_by_name"] = rows_by_name
+    model_data["ingredient_index"] = {name: rows[0] for name, rows in rows_by_name.items()}
+    
+    index = NeighborIndex.open(NEIGHBOR_INDEX_DIR)
+    if index is not None and index.source != file_fingerprint(path):
+        print("Neighbour index is stale for flavor_model.pkl - rebuild with `python -m ml.neighbor_index`")
+        index = None
+    model_data["neighbors"] = index
+    return model_data
+
+# Loaded once per process and reloaded in place when flavor_model.pkl changes
+model_registry = ModelRegistry(MODEL_PATH, _load_model)
 
 def predict_substitute(ingredient_name):
     """
     Predict ingredient substitutes using ML model
     """
+    return predict_substitutes_batch([ingredient_name])[0]
+
+def predict_substitutes_batch(ingredient_names):
+    """
+    Predict substitutes for many ingredients at once
+    
+    Ingredients missing from the neighbour index are scored together with a
+    single sparse matrix product against the flavor matrix. Returns one result
+    per input, in order, each shaped like predict_substitute's.
+    """
     if not SKLEARN_AVAILABLE:
-        return {"error": "ML dependencies not available - please check environment"}
+        return [{"error": "ML dependencies not available - please check environment"}] * len(ingredient_names)
     
     try:
-        model_data = joblib.load(MODEL_PATH)
-        
-        vectorizer = model_data["vectorizer"]
-        X = model_data["flavor_matrix"]
-        df = model_data["dataframe"]
-        
-        if ingredient_name not in df["ingredient"].values:
-            return {"error": "Ingredient not found"}
+        model_data = model_registry.get()
+    except Exception as e:
+        return [{"error": f"Model loading failed: {str(e)}"}] * len(ingredient_names)
+    
+    index = model_data.get("neighbors")
+    results = [None] * len(ingredient_names)
+    pending = []
+    for pos, ingredient_name in enumerate(ingredient_names):
+        if index is not None and ingredient_name in index:
+            results[pos] = [
+                {"ingredient": name, "score": round(score * 100, 2)}
+                for name, score in index.neighbors(ingredient_name, limit=3)
+            ]
+            continue
         
-        idx = df[df["ingredient"] == ingredient_name].index[0]
-        similarity_scores = cosine_similarity(X[idx], X)[0]
-        similar_indices = similarity_scores.argsort()[::-1][1:4]
+        idx = model_data["ingredient_index"].get(ingredient_name)
+        if idx is None:
+            results[pos] = {"error": "Ingredient not found"}
+        else:
+            pending.append((pos, idx, ingredient_name))
+    
+    if not pending:
+        return results
+    
+    # Fall back to scoring against the full matrix
+    try:
+        from sklearn.metrics.pairwise import cosine_similarity
         
-        results = []
-        for i in similar_indices:
-            results.append({
-                "ingredient": df.iloc[i]["ingredient"],
-                "score": round(float(similarity_scores[i]) * 100, 2)
-            })
+        X = model_data["flavor_matrix"]
+        names = model_data["names"]
+        similarity_matrix = cosine_similarity(X[[idx for _, idx, _ in pending]], X)
         
-        return results
+        for similarity_scores, (pos, idx, ingredient_name) in zip(similarity_matrix, pending):
+            # Exclude the ingredient itself, including any duplicate rows of it
+            similar_indices = rank_neighbors(similarity_scores, model_data["rows_by_name"][ingredient_name], 3)
+            
+            results[pos] = [
+                {"ingredient": names[i], "score": round(float(similarity_scores[i]) * 100, 2)}
+                for i in similar_indices
+            ]
         
     except Exception as e:
-        return {"error": f"Model loading failed: {str(e)}"}
+        for pos, _, _ in pending:
+            results[pos] = {"error": f"Prediction failed: {str(e)}"}
+    
+    return results
@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+
+
+class ModelRegistry:
+    """
+    Process-wide holder for a model file that is loaded once and served from memory.
+
+    The file's mtime is checked at most every `check_interval` seconds. When it
+    changes, one caller reloads the model while every other request keeps using
+    the version that is already in memory; the new version is swapped in with a
+    single reference assignment once it is fully loaded.
+    """
+
+    def __init__(self, path, loader, check_interval=1.0):
+        self.path = path
+        self.loader = loader
+        self.check_interval = check_interval
+
+        self._model = None
+        self._mtime = None
+        self._last_check = 0.0
+        self._reload_lock = threading.Lock()
+        self._listeners = []
+
+        self._stats = {
+            "loads": 0,
+            "reloads": 0,
+            "load_failures": 0,
+            "last_load_seconds": None,
+            "total_load_seconds": 0.0,
+            "last_loaded_at": None,
+        }
+
+    def add_reload_listener(self, callback):
+        """Register a callback invoked with the new model after every successful load or reload"""
+        self._listeners.append(callback)
+
+    def get(self):
+        """Return the in-memory model, loading or reloading it if the file changed"""
+        now = time.monotonic()
+        if self._model is not None and now - self._last_check < self.check_interval:
+            return self._model
+        self._last_check = now
+
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            if self._model is None:
+                raise FileNotFoundError(f"Model file not found: {self.path}")
+            return self._model
+
+        if self._model is not None and mtime == self._mtime:
+            return self._model
+
+        # Someone else is already (re)loading; serve the current version
+        # instead of queueing behind the load.
+        if not self._reload_lock.acquire(blocking=self._model is None):
+            return self._model
+        try:
+            if self._model is None or mtime != self._mtime:
+                self._load(mtime)
+        finally:
+            self._reload_lock.release()
+
+        return self._model
+
+    def load(self):
+        """Eagerly load the model, e.g. at application startup"""
+        try:
+            return self.get()
+        except Exception as e:
+            print(f"Model preload failed for {self.path}: {e}")
+            return None
+
+    def _load(self, mtime):
+        is_reload = self._model is not None
+        start = time.perf_counter()
+        try:
+            model = self.loader(self.path)
+        except Exception:
+            self._stats["load_failures"] += 1
+            if is_reload:
+                # Keep serving the previous version; retry on the next check.
+                return
+            raise
+        elapsed = time.perf_counter() - start
+
+        self._model = model
+        self._mtime = mtime
+
+        self._stats["loads"] += 1
+        self._stats["last_load_seconds"] = round(elapsed, 6)
+        self._stats["total_load_seconds"] = round(self._stats["total_load_seconds"] + elapsed, 6)
+        self._stats["last_loaded_at"] = time.time()
+
+        if is_reload:
+            self._stats["reloads"] += 1
+        # Also on the first load, which may follow a failed one: anything
+        # derived while the model was missing is out of date now
+        for callback in self._listeners:
+            try:
+                callback(model)
+            except Exception as e:
+                print(f"Model reload listener failed: {e}")
+
+    def version(self):
+        """mtime of the model file currently in memory, or None while none is loaded"""
+        return self._mtime if self._model is not None else None
+
+    def stats(self):
+        """Return load/reload counters for the metrics endpoint"""
+        return {
+            "path": self.path,
+            "loaded": self._model is not None,
+            **self._stats,
+        }
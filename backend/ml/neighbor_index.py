@@ -0,0 +1,145 @@
+import json
+import os
+import numpy as np
+
+NEIGHBORS_DIR = os.path.join(os.path.dirname(__file__), "neighbors")
+DEFAULT_K = 10
+
+def file_fingerprint(path):
+    """Identify a model file version so a stale index is never paired with it"""
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+class NeighborIndex:
+    """
+    Precomputed top-k substitutes per ingredient, memory-mapped from disk
+
+    Layout of an index directory:
+        indices.npy  int32   (n, k) row ids of the k most similar ingredients, -1 padded
+        scores.npy   float32 (n, k) cosine similarity for each neighbour
+        meta.json    ingredient names in row order, k and the source fingerprint
+    """
+
+    def __init__(self, names, indices, scores, source=None):
+        self.names = names
+        self.indices = indices
+        self.scores = scores
+        self.source = source
+        self.k = indices.shape[1] if indices.ndim == 2 else 0
+        self._rows = {}
+        for i, name in enumerate(names):
+            self._rows.setdefault(name, i)
+
+    @classmethod
+    def open(cls, index_dir):
+        """Memory-map an index directory, returning None if it has not been built"""
+        meta_path = os.path.join(index_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+            indices = np.load(os.path.join(index_dir, "indices.npy"), mmap_mode="r")
+            scores = np.load(os.path.join(index_dir, "scores.npy"), mmap_mode="r")
+        except Exception as e:
+            print(f"Error opening neighbour index {index_dir}: {e}")
+            return None
+        return cls(meta["names"], indices, scores, meta.get("source"))
+
+    def __contains__(self, name):
+        return name in self._rows
+
+    def neighbors(self, name, limit=3, min_score=None):
+        """
+        Return up to `limit` (ingredient, score) pairs for `name`, best first,
+        or None if the ingredient is not in the index
+        """
+        row = self._rows.get(name)
+        if row is None:
+            return None
+
+        results = []
+        for j, score in zip(self.indices[row], self.scores[row]):
+            if j < 0 or len(results) >= limit:
+                break
+            if min_score is not None and score <= min_score:
+                break
+            results.append((self.names[j], float(score)))
+        return results
+
+def rank_neighbors(scores, exclude=(), limit=None):
+    """
+    Row ids in `scores`, best first, leaving out the `exclude` rows
+
+    Uses the models' original `argsort()[::-1]` ranking over the full row, so
+    ties come out in the same order as before the index existed.
+    """
+    exclude = set(exclude)
+    ranked = [int(j) for j in scores.argsort()[::-1] if j not in exclude]
+    return ranked if limit is None else ranked[:limit]
+
+def build_neighbor_index(names, X, index_dir, k=DEFAULT_K, source=None, chunk_size=1024):
+    """
+    Compute the top-k cosine neighbours of every row of X and write them to index_dir
+
+    Rows that share an ingredient name are never listed as each other's substitute.
+    """
+    from scipy import sparse
+
+    # Ranked in float64 like the models, so near-ties order the same way
+    X = sparse.csr_matrix(X, dtype=np.float64)
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1))).ravel()
+    norms[norms == 0] = 1.0
+    X = sparse.diags(1.0 / norms).dot(X).tocsr()
+
+    n = X.shape[0]
+    k = min(k, max(n - 1, 0))
+    indices = np.full((n, k), -1, dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+
+    same_name = {}
+    for i, name in enumerate(names):
+        same_name.setdefault(name, []).append(i)
+
+    XT = X.T.tocsc()
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        sims = np.asarray((X[start:stop] @ XT).todense())
+        for offset, i in enumerate(range(start, stop)):
+            top = rank_neighbors(sims[offset], same_name[names[i]], k)
+            indices[i, :len(top)] = top
+            scores[i, :len(top)] = sims[offset, top]
+
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, "indices.npy"), indices)
+    np.save(os.path.join(index_dir, "scores.npy"), scores)
+    with open(os.path.join(index_dir, "meta.json"), "w") as f:
+        json.dump({"names": list(names), "k": k, "source": source}, f)
+
+    return NeighborIndex.open(index_dir)
+
+# Build the indexes for both substitution models
+if __name__ == "__main__":
+    from ml import simple_model
+
+    index = build_neighbor_index(
+        simple_model.ingredients_data,
+        simple_model.get_model()["X"],
+        os.path.join(NEIGHBORS_DIR, "simple_model"),
+        source=simple_model.DATASET_HASH,
+    )
+    print(f"Simple model index: {len(index.names)} ingredients, k={index.k}")
+
+    from ml.ml_engine import MODEL_PATH
+    if os.path.exists(MODEL_PATH):
+        import joblib
+        model_data = joblib.load(MODEL_PATH)
+        index = build_neighbor_index(
+            list(model_data["dataframe"]["ingredient"]),
+            model_data["flavor_matrix"],
+            os.path.join(NEIGHBORS_DIR, "flavor_model"),
+            source=file_fingerprint(MODEL_PATH),
+        )
+        print(f"ML engine index: {len(index.names)} ingredients, k={index.k}")
+    else:
+        print(f"Skipping ML engine index: {MODEL_PATH} not found")
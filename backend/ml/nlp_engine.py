@@ -1,47 +1,151 @@
+import hashlib
+import json
+import threading
 import spacy
-from typing import Dict, List, Set
+from typing import Dict, List
+from app.config import NLP_PROFILE
+from app.reference_data import INGREDIENT_PROFILES
+from ml.keyword_matcher import KeywordMatcher
+
+MODEL_NAME = "en_core_web_sm"
+
+# spaCy components left out by each pipeline profile:
+# - full:    tagger, parser, NER and lemmatizer; the only profile that fills "entities"
+# - lemmas:  no parser or NER; the rule lemmatizer still gets POS from the tagger
+# - lexical: no trained model at all, just the tokenizer and lookup lemmas
+PIPELINE_PROFILES = {
+    "full": [],
+    "lemmas": ["parser", "ner"],
+    "lexical": None,
+}
+
+def _load_model(exclude):
+    try:
+        return spacy.load(MODEL_NAME, exclude=exclude)
+    except OSError:
+        print("spaCy model not found. Installing...")
+        import subprocess
+        import sys
+        subprocess.check_call([sys.executable, "-m", "spacy", "download", MODEL_NAME])
+        return spacy.load(MODEL_NAME, exclude=exclude)
+
+def _load_lexical():
+    """Tokenizer plus lookup-table lemmas (spacy-lookups-data); lemmas fall back to the token text"""
+    nlp = spacy.blank("en")
+    try:
+        nlp.add_pipe("lemmatizer", config={"mode": "lookup"})
+        nlp.initialize()
+    except Exception as e:
+        print(f"Lookup lemmas unavailable ({e}); the lexical profile will use token text")
+        nlp = spacy.blank("en")
+    return nlp
+
+# Allergy keywords; multi-word ones are matched as phrases
+ALLERGY_KEYWORDS = frozenset({
+    'nuts', 'peanut', 'almond', 'walnut', 'cashew', 'pecan', 'hazelnut',
+    'dairy', 'milk', 'cheese', 'butter', 'cream', 'yogurt', 'lactose',
+    'gluten', 'wheat', 'flour', 'bread', 'pasta', 'barley', 'rye',
+    'egg', 'eggs',
+    'soy', 'tofu', 'soybean', 'edamame',
+    'fish', 'salmon', 'tuna', 'cod', 'trout',
+    'shellfish', 'shrimp', 'crab', 'lobster', 'clam', 'mussel',
+    'sesame', 'poppy', 'mustard',
+    'tree nut', 'tree nuts', 'soy sauce', 'soy milk', 'peanut butter', 'fish sauce', 'sesame oil'
+})
+
+# Taste keywords
+TASTE_KEYWORDS = frozenset({
+    'sweet', 'sugary', 'honeyed', 'candied', 'syrupy',
+    'sour', 'tart', 'acidic', 'citrus', 'tangy',
+    'bitter', 'sharp', 'pungent', 'acrid',
+    'salty', 'savory', 'umami', 'briny',
+    'spicy', 'hot', 'peppery', 'piquant', 'zesty',
+    'creamy', 'smooth', 'rich', 'velvety',
+    'crunchy', 'crispy', 'hard', 'firm',
+    'soft', 'tender', 'chewy', 'gooey',
+    'fresh', 'herbal', 'grassy', 'green',
+    'fruity', 'juicy', 'ripe', 'tropical',
+    'nutty', 'earthy', 'woody', 'mushroom',
+    'floral', 'perfumed', 'aromatic',
+    'smoky', 'roasted', 'toasted', 'grilled',
+    'burnt', 'charred', 'caramelized'
+})
+
+# Phrases that set each dietary preference flag; hyphenated ones also match when spaced
+DIETARY_PHRASES = {
+    'vegan': ['vegan', 'plant-based', 'animal-free'],
+    'vegetarian': ['vegetarian', 'meat-free'],
+    'gluten_free': ['gluten-free', 'celiac', 'no-gluten'],
+    'dairy_free': ['dairy-free', 'lactose-free', 'no-dairy'],
+    'nut_free': ['nut-free', 'no-nuts'],
+    'low_sugar': ['low-sugar', 'sugar-free', 'no-sugar'],
+    'low_sodium': ['low-sodium', 'salt-free', 'no-salt']
+}
+
+# Allergen/taste tags from the shared reference data, as sets for fast intersection
+INGREDIENT_TAGS = tuple(
+    (ingredient, frozenset(info['allergens']), frozenset(info['tastes']))
+    for ingredient, info in INGREDIENT_PROFILES.items()
+)
+
+def suggest_ingredients(allergies: List[str], tastes: List[str]) -> List[str]:
+    """
+    Top 10 ingredients free of `allergies`, best taste match first
+
+    Needs no spaCy pipeline, so processes that hand parsing to NLP workers
+    never load a model just to rank suggestions.
+    """
+    suggestions = []
+    user_allergies = set(allergies)
+    user_tastes = set(tastes)
+    
+    # Filter ingredients based on allergies and tastes
+    for ingredient, ingredient_allergens, ingredient_tastes in INGREDIENT_TAGS:
+        # Skip if ingredient contains allergens
+        if ingredient_allergens & user_allergies:
+            continue
+        
+        # Score based on taste preferences
+        taste_score = len(ingredient_tastes & user_tastes)
+        
+        if taste_score > 0 or not user_tastes:  # Include if tastes match or no taste preference
+            suggestions.append({
+                'ingredient': ingredient,
+                'taste_score': taste_score,
+                'taste_matches': list(ingredient_tastes & user_tastes),
+                'allergen_free': True
+            })
+    
+    # Sort by taste score
+    suggestions.sort(key=lambda x: x['taste_score'], reverse=True)
+    
+    return [s['ingredient'] for s in suggestions[:10]]  # Return top 10
 
 class NLPEngine:
-    def __init__(self):
-        """Initialize the NLP engine with spaCy model"""
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            print("spaCy model not found. Installing...")
-            import subprocess
-            import sys
-            subprocess.check_call([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
-            self.nlp = spacy.load("en_core_web_sm")
+    def __init__(self, profile: str = "full"):
+        """Initialize the NLP engine with the spaCy pipeline for `profile`"""
+        if profile not in PIPELINE_PROFILES:
+            raise ValueError(f"Unknown NLP profile: {profile}")
+        self.profile = profile
+        exclude = PIPELINE_PROFILES[profile]
+        self.nlp = _load_lexical() if exclude is None else _load_model(exclude)
         
-        # Define allergy keywords
-        self.allergy_keywords = {
-            'nuts', 'peanut', 'almond', 'walnut', 'cashew', 'pecan', 'hazelnut',
-            'dairy', 'milk', 'cheese', 'butter', 'cream', 'yogurt', 'lactose',
-            'gluten', 'wheat', 'flour', 'bread', 'pasta', 'barley', 'rye',
-            'egg', 'eggs',
-            'soy', 'tofu', 'soybean', 'edamame',
-            'fish', 'salmon', 'tuna', 'cod', 'trout',
-            'shellfish', 'shrimp', 'crab', 'lobster', 'clam', 'mussel',
-            'sesame', 'poppy', 'mustard'
-        }
+        self.allergy_keywords = set(ALLERGY_KEYWORDS)
+        self.taste_keywords = set(TASTE_KEYWORDS)
         
-        # Define taste keywords
-        self.taste_keywords = {
-            'sweet', 'sugary', 'honeyed', 'candied', 'syrupy',
-            'sour', 'tart', 'acidic', 'citrus', 'tangy',
-            'bitter', 'sharp', 'pungent', 'acrid',
-            'salty', 'savory', 'umami', 'briny',
-            'spicy', 'hot', 'peppery', 'piquant', 'zesty',
-            'creamy', 'smooth', 'rich', 'velvety',
-            'crunchy', 'crispy', 'hard', 'firm',
-            'soft', 'tender', 'chewy', 'gooey',
-            'fresh', 'herbal', 'grassy', 'green',
-            'fruity', 'juicy', 'ripe', 'tropical',
-            'nutty', 'earthy', 'woody', 'mushroom',
-            'floral', 'perfumed', 'aromatic',
-            'smoky', 'roasted', 'toasted', 'grilled',
-            'burnt', 'charred', 'caramelized'
-        }
+        self.ingredient_profiles = INGREDIENT_TAGS
+        
+        # Every keyword and dietary phrase in one matcher, tokenized like the queries
+        self.matcher = KeywordMatcher.build(
+            {
+                **{('allergies', keyword): [keyword] for keyword in self.allergy_keywords},
+                **{('tastes', keyword): [keyword] for keyword in self.taste_keywords},
+                **{('dietary_preferences', flag): phrases for flag, phrases in DIETARY_PHRASES.items()}
+            },
+            lambda text: [token.text for token in self.nlp.tokenizer(text)],
+            # A phrase must never hide the allergens inside it ("soy milk" still reports soy)
+            overlapping=('allergies',)
+        )
     
     def parse_query(self, query: str) -> Dict:
         """
@@ -51,57 +155,63 @@ class NLPEngine:
             query: User input string
             
         Returns:
-            Dictionary containing extracted allergies and tastes
+            Dictionary containing extracted allergies, tastes and dietary preferences
         """
         if not query:
-            return {"allergies": [], "tastes": [], "entities": []}
+            return self._parse_matches([], [], [])
         
         # Process the query with spaCy
-        doc = self.nlp(query.lower())
+        return self._parse_doc(self.nlp(query.lower()))
+    
+    def parse_queries(self, queries: List[str], batch_size: int = 64) -> List[Dict]:
+        """
+        Parse many queries at once, streaming them through nlp.pipe
         
+        Args:
+            queries: User input strings
+            batch_size: Number of texts spaCy processes together
+            
+        Returns:
+            One parse_query result per query, in order
+        """
+        results = [self._parse_matches([], [], []) for _ in queries]
+        positions = [i for i, query in enumerate(queries) if query]
+        docs = self.nlp.pipe((queries[i].lower() for i in positions), batch_size=batch_size)
+        for i, doc in zip(positions, docs):
+            results[i] = self._parse_doc(doc)
+        return results
+    
+    def _parse_doc(self, doc) -> Dict:
+        """Extract allergies, tastes, dietary preferences and entities from a processed doc"""
         # Extract tokens and lemmas
         tokens = [token.text for token in doc]
-        lemmas = [token.lemma_ for token in doc]
-        
-        # Find allergies
-        allergies = self._find_allergies(tokens, lemmas)
-        
-        # Find taste preferences
-        tastes = self._find_tastes(tokens, lemmas)
+        lemmas = [token.lemma_ or token.text for token in doc]
         
         # Extract named entities
         entities = [{"text": ent.text, "label": ent.label_} for ent in doc.ents]
         
+        return self._parse_matches(tokens, lemmas, entities)
+    
+    def _parse_matches(self, tokens: List[str], lemmas: List[str], entities: List[Dict]) -> Dict:
+        """Allergies, tastes and dietary flags from one matcher pass over the tokens"""
+        allergies, tastes, diets = {}, {}, set()
+        for category, value, start, end in self.matcher.find(tokens, lemmas):
+            if category == 'dietary_preferences':
+                diets.add(value)
+            else:
+                # A single keyword is reported as its lemma, a phrase as written
+                found = allergies if category == 'allergies' else tastes
+                found[lemmas[start] if end - start == 1 else value] = None
+        
         return {
             "allergies": list(allergies),
             "tastes": list(tastes),
             "entities": entities,
             "tokens": tokens,
-            "lemmas": lemmas
+            "lemmas": lemmas,
+            "dietary_preferences": {flag: flag in diets for flag in DIETARY_PHRASES}
         }
     
-    def _find_allergies(self, tokens: List[str], lemmas: List[str]) -> Set[str]:
-        """Find allergy-related keywords in the query"""
-        allergies = set()
-        
-        # Check tokens and lemmas against allergy keywords
-        for token, lemma in zip(tokens, lemmas):
-            if token in self.allergy_keywords or lemma in self.allergy_keywords:
-                allergies.add(lemma)
-        
-        return allergies
-    
-    def _find_tastes(self, tokens: List[str], lemmas: List[str]) -> Set[str]:
-        """Find taste-related keywords in the query"""
-        tastes = set()
-        
-        # Check tokens and lemmas against taste keywords
-        for token, lemma in zip(tokens, lemmas):
-            if token in self.taste_keywords or lemma in self.taste_keywords:
-                tastes.add(lemma)
-        
-        return tastes
-    
     def get_ingredient_suggestions(self, query: str, allergies: List[str], tastes: List[str]) -> List[str]:
         """
         Get ingredient suggestions based on parsed query
@@ -114,68 +224,7 @@ class NLPEngine:
         Returns:
             List of suggested ingredients
         """
-        # Basic ingredient database with allergy and taste information
-        ingredient_db = {
-            'milk': {'allergens': ['dairy', 'lactose'], 'tastes': ['creamy', 'sweet']},
-            'almond milk': {'allergens': ['nuts'], 'tastes': ['nutty', 'creamy']},
-            'coconut milk': {'allergens': [], 'tastes': ['creamy', 'sweet', 'tropical']},
-            'soy milk': {'allergens': ['soy'], 'tastes': ['creamy', 'nutty']},
-            'butter': {'allergens': ['dairy'], 'tastes': ['creamy', 'rich', 'salty']},
-            'coconut oil': {'allergens': [], 'tastes': ['creamy', 'sweet']},
-            'olive oil': {'allergens': [], 'tastes': ['fruity', 'peppery']},
-            'cheese': {'allergens': ['dairy'], 'tastes': ['salty', 'savory', 'creamy']},
-            'nutritional yeast': {'allergens': [], 'tastes': ['savory', 'nutty', 'cheesy']},
-            'cashew cheese': {'allergens': ['nuts'], 'tastes': ['creamy', 'nutty', 'savory']},
-            'eggs': {'allergens': ['egg'], 'tastes': ['rich', 'creamy']},
-            'flax eggs': {'allergens': [], 'tastes': ['nutty', 'earthy']},
-            'chia eggs': {'allergens': [], 'tastes': ['nutty', 'earthy']},
-            'applesauce': {'allergens': [], 'tastes': ['sweet', 'fruity']},
-            'flour': {'allergens': ['gluten', 'wheat'], 'tastes': ['neutral', 'earthy']},
-            'almond flour': {'allergens': ['nuts'], 'tastes': ['nutty', 'sweet']},
-            'coconut flour': {'allergens': [], 'tastes': ['sweet', 'tropical']},
-            'sugar': {'allergens': [], 'tastes': ['sweet', 'sugary']},
-            'honey': {'allergens': [], 'tastes': ['sweet', 'floral']},
-            'maple syrup': {'allergens': [], 'tastes': ['sweet', 'woody']},
-            'stevia': {'allergens': [], 'tastes': ['sweet', 'bitter']},
-            'vanilla': {'allergens': [], 'tastes': ['sweet', 'floral', 'aromatic']},
-            'chocolate': {'allergens': [], 'tastes': ['sweet', 'bitter', 'rich']},
-            'cinnamon': {'allergens': [], 'tastes': ['sweet', 'spicy', 'warm']},
-            'garlic': {'allergens': [], 'tastes': ['pungent', 'spicy', 'savory']},
-            'lemon': {'allergens': [], 'tastes': ['sour', 'citrus', 'fresh']},
-            'basil': {'allergens': [], 'tastes': ['fresh', 'herbal', 'slightly sweet']},
-            'ginger': {'allergens': [], 'tastes': ['spicy', 'pungent', 'warm']},
-            'mint': {'allergens': [], 'tastes': ['fresh', 'cool', 'slightly sweet']}
-        }
-        
-        suggestions = []
-        
-        # Filter ingredients based on allergies and tastes
-        for ingredient, info in ingredient_db.items():
-            # Skip if ingredient contains allergens
-            ingredient_allergens = set(info['allergens'])
-            user_allergies = set(allergies)
-            
-            if ingredient_allergens & user_allergies:
-                continue
-            
-            # Score based on taste preferences
-            ingredient_tastes = set(info['tastes'])
-            user_tastes = set(tastes)
-            
-            taste_score = len(ingredient_tastes & user_tastes)
-            
-            if taste_score > 0 or not user_tastes:  # Include if tastes match or no taste preference
-                suggestions.append({
-                    'ingredient': ingredient,
-                    'taste_score': taste_score,
-                    'taste_matches': list(ingredient_tastes & user_tastes),
-                    'allergen_free': True
-                })
-        
-        # Sort by taste score
-        suggestions.sort(key=lambda x: x['taste_score'], reverse=True)
-        
-        return [s['ingredient'] for s in suggestions[:10]]  # Return top 10
+        return suggest_ingredients(allergies, tastes)
     
     def analyze_dietary_preferences(self, query: str) -> Dict:
         """
@@ -187,25 +236,68 @@ class NLPEngine:
         Returns:
             Dictionary with dietary analysis
         """
-        parsed = self.parse_query(query)
-        
-        dietary_preferences = {
-            'vegan': any(word in parsed['tokens'] for word in ['vegan', 'plant-based', 'animal-free']),
-            'vegetarian': any(word in parsed['tokens'] for word in ['vegetarian', 'meat-free']),
-            'gluten_free': any(word in parsed['tokens'] for word in ['gluten-free', 'celiac', 'no-gluten']),
-            'dairy_free': any(word in parsed['tokens'] for word in ['dairy-free', 'lactose-free', 'no-dairy']),
-            'nut_free': any(word in parsed['tokens'] for word in ['nut-free', 'no-nuts']),
-            'low_sugar': any(word in parsed['tokens'] for word in ['low-sugar', 'sugar-free', 'no-sugar']),
-            'low_sodium': any(word in parsed['tokens'] for word in ['low-sodium', 'salt-free', 'no-salt'])
-        }
-        
-        return {
-            **parsed,
-            'dietary_preferences': dietary_preferences
-        }
+        # Dietary flags come out of the same matcher pass as allergies and tastes
+        return self.parse_query(query)
+    
+    def analyze_dietary_preferences_batch(self, queries: List[str], batch_size: int = 64) -> List[Dict]:
+        """
+        analyze_dietary_preferences for many queries, parsed together with nlp.pipe
+        """
+        return self.parse_queries(queries, batch_size)
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_nlp_engine(profile: str = None) -> NLPEngine:
+    """
+    Shared engine for a pipeline profile (NLP_PROFILE by default), loaded on first use
+    """
+    profile = profile or NLP_PROFILE
+    engine = _engines.get(profile)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(profile)
+            if engine is None:
+                engine = _engines[profile] = NLPEngine(profile)
+    return engine
+
+# Bump when parse results change in a way the keyword lists do not capture
+PARSE_FORMAT_VERSION = 3
+
+def parse_fingerprint() -> str:
+    """
+    Digest of everything a parse result depends on: keyword lists, dietary
+    phrases, the default profile and the spaCy, model and lookup table
+    versions. Saved parses are only reused while it is unchanged.
+    """
+    inputs = {
+        "format": PARSE_FORMAT_VERSION,
+        "allergies": sorted(ALLERGY_KEYWORDS),
+        "tastes": sorted(TASTE_KEYWORDS),
+        "dietary": DIETARY_PHRASES,
+        "profile": NLP_PROFILE,
+        "spacy": spacy.__version__,
+        "model": spacy.util.get_package_version(MODEL_NAME),
+        "lookups": spacy.util.get_package_version("spacy-lookups-data"),
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+def analyze_batch(items: List[tuple], batch_size: int = 64) -> List[Dict]:
+    """
+    analyze_dietary_preferences for (query, profile) items, one nlp.pipe call per profile
 
-# Initialize the NLP engine
-nlp_engine = NLPEngine()
+    A profile of None means NLP_PROFILE. Module-level so NLP worker processes
+    can run it on their own engines.
+    """
+    results = [None] * len(items)
+    by_profile = {}
+    for i, (_, profile) in enumerate(items):
+        by_profile.setdefault(profile, []).append(i)
+    for profile, positions in by_profile.items():
+        parsed = get_nlp_engine(profile).analyze_dietary_preferences_batch([items[i][0] for i in positions], batch_size)
+        for i, result in zip(positions, parsed):
+            results[i] = result
+    return results
 
 # Example usage
 if __name__ == "__main__":
@@ -216,6 +308,7 @@ if __name__ == "__main__":
         "No eggs or soy, looking for something sweet"
     ]
     
+    nlp_engine = get_nlp_engine()
     for query in test_queries:
         print(f"\nQuery: {query}")
         result = nlp_engine.analyze_dietary_preferences(query)
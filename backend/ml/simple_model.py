@@ -1,7 +1,8 @@
-import pandas as pd
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import hashlib
+import json
+import os
+import threading
+from ml.neighbor_index import NeighborIndex, NEIGHBORS_DIR, rank_neighbors
 
 # Create a more comprehensive dataset with common ingredients
 ingredients_data = [
@@ -31,14 +32,80 @@ ingredients_data = [
     "chicken", "beef", "pork", "fish", "tofu", "tempeh", "seitan"
 ]
 
-# Create simple feature matrix
-vectorizer = TfidfVectorizer(ngram_range=(1, 2), stop_words='english')
-X = vectorizer.fit_transform(ingredients_data)
+# Fitted TF-IDF matrix, written at build time by `python -m ml.simple_model`.
+# The source hash ties the artifacts to this exact ingredient list.
+DATASET_HASH = hashlib.sha1("\n".join(ingredients_data).encode()).hexdigest()
+MODEL_DIR = os.path.join(os.path.dirname(__file__), "artifacts", "simple_model")
+MATRIX_PATH = os.path.join(MODEL_DIR, "matrix.npz")
+META_PATH = os.path.join(MODEL_DIR, "meta.json")
 
-# Create DataFrame
-df = pd.DataFrame({
-    'ingredient': ingredients_data
-})
+# Precomputed top-k substitutes, built offline with `python -m ml.neighbor_index`
+NEIGHBOR_INDEX_DIR = os.path.join(NEIGHBORS_DIR, "simple_model")
+
+_model = None
+_model_lock = threading.Lock()
+
+def fit_matrix():
+    """Fit the TF-IDF matrix from scratch (build time only - imports sklearn)"""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2), stop_words='english')
+    return vectorizer.fit_transform(ingredients_data).tocsr()
+
+def save_model():
+    """Fit the model and serialize it next to this module"""
+    from scipy import sparse
+    
+    X = fit_matrix()
+    os.makedirs(MODEL_DIR, exist_ok=True)
+    sparse.save_npz(MATRIX_PATH, X)
+    with open(META_PATH, "w") as f:
+        json.dump({"names": ingredients_data, "source": DATASET_HASH}, f)
+    return X
+
+def _load_matrix():
+    """Load the serialized matrix, refitting in-process if it is missing or stale"""
+    from scipy import sparse
+    
+    try:
+        with open(META_PATH) as f:
+            meta = json.load(f)
+        if meta.get("source") == DATASET_HASH:
+            return sparse.load_npz(MATRIX_PATH).tocsr()
+        print("Simple model artifacts are stale - rebuild with `python -m ml.simple_model`")
+    except FileNotFoundError:
+        print("Simple model artifacts not found - rebuild with `python -m ml.simple_model`")
+    return fit_matrix()
+
+def get_model():
+    """
+    Return the simple model, loading it on first use
+
+    Nothing heavier than numpy is imported until a request actually needs the model.
+    """
+    global _model
+    if _model is not None:
+        return _model
+    
+    with _model_lock:
+        if _model is None:
+            index = NeighborIndex.open(NEIGHBOR_INDEX_DIR)
+            if index is not None and index.source != DATASET_HASH:
+                print("Neighbour index is stale for simple_model - rebuild with `python -m ml.neighbor_index`")
+                index = None
+            # Duplicate names ("tofu") keep all their rows, so the fitted
+            # weights match the full list; requests resolve to the first row
+            rows_by_name = {}
+            for i, name in enumerate(ingredients_data):
+                rows_by_name.setdefault(name, []).append(i)
+            _model = {
+                "X": _load_matrix(),
+                # Name -> row of X, so requests never scan a DataFrame
+                "ingredient_index": {name: rows[0] for name, rows in rows_by_name.items()},
+                "rows_by_name": rows_by_name,
+                "neighbors": index,
+            }
+    return _model
 
 def predict_substitute(ingredient_name):
     """
@@ -47,29 +114,66 @@ def predict_substitute(ingredient_name):
     if not ingredient_name:
         return {"error": "Ingredient name is required"}
     
-    ingredient_name = ingredient_name.lower().strip()
+    return predict_substitutes_batch([ingredient_name])[0]
+
+def predict_substitutes_batch(ingredient_names):
+    """
+    Predict substitutes for many ingredients at once
     
-    # Check if ingredient exists in our dataset
-    if ingredient_name not in df['ingredient'].values:
-        return {"error": "Ingredient not found"}
+    Ingredients missing from the neighbour index are scored with one sparse
+    matrix product. Returns one result per input, in order.
+    """
+    model = get_model()
+    neighbor_index = model["neighbors"]
+    results = [None] * len(ingredient_names)
+    pending = []
     
-    # Find the index of the ingredient
-    idx = df[df['ingredient'] == ingredient_name].index[0]
+    for pos, ingredient_name in enumerate(ingredient_names):
+        if not ingredient_name:
+            results[pos] = {"error": "Ingredient name is required"}
+            continue
+        ingredient_name = ingredient_name.lower().strip()
+        
+        # O(1) lookup in the precomputed index when available
+        if neighbor_index is not None and ingredient_name in neighbor_index:
+            matches = [
+                {"ingredient": name, "score": round(score * 100, 2)}
+                for name, score in neighbor_index.neighbors(ingredient_name, limit=3, min_score=0.1)
+            ]
+            results[pos] = matches if matches else {"error": "No good substitutes found"}
+            continue
+        
+        idx = model["ingredient_index"].get(ingredient_name)
+        if idx is None:
+            results[pos] = {"error": "Ingredient not found"}
+        else:
+            pending.append((pos, idx))
     
-    # Calculate cosine similarity
-    ingredient_vector = vectorizer.transform([ingredient_name])
-    similarity_scores = cosine_similarity(ingredient_vector, X)[0]
+    if not pending:
+        return results
     
-    # Get top 3 most similar (excluding itself)
-    similar_indices = similarity_scores.argsort()[::-1][1:4]
+    # TF-IDF rows are L2-normalised, so the dot product is the cosine similarity
+    X = model["X"]
+    similarity_matrix = (X[[idx for _, idx in pending]] @ X.T).toarray()
     
-    results = []
-    for i in similar_indices:
-        score = similarity_scores[i]
-        if score > 0.1:  # Only return meaningful matches
-            results.append({
-                "ingredient": df.iloc[i]["ingredient"],
-                "score": round(float(score * 100), 2)
-            })
+    for similarity_scores, (pos, idx) in zip(similarity_matrix, pending):
+        # Get top 3 most similar (excluding itself)
+        similar_indices = rank_neighbors(similarity_scores, model["rows_by_name"][ingredients_data[idx]], 3)
+        
+        matches = []
+        for i in similar_indices:
+            score = similarity_scores[i]
+            if score > 0.1:  # Only return meaningful matches
+                matches.append({
+                    "ingredient": ingredients_data[i],
+                    "score": round(float(score * 100), 2)
+                })
+        
+        results[pos] = matches if matches else {"error": "No good substitutes found"}
     
-    return results if results else {"error": "No good substitutes found"}
+    return results
+
+# Serialize the fitted model
+if __name__ == "__main__":
+    X = save_model()
+    print(f"Simple model saved to {MODEL_DIR}: {X.shape[0]} ingredients, {X.shape[1]} features")
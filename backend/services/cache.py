@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    Bounded, thread-safe LRU cache whose entries also expire after `ttl` seconds
+
+    A ttl of None (or 0) disables expiry and leaves a plain LRU.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl or None
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default on a miss"""
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entry if full"""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every entry, e.g. after the underlying model reloads"""
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def save(self, path, version=None):
+        """
+        Write live entries, least recently used first, as JSON and atomically swap the file in
+
+        Keys must be strings and values JSON-serializable. Expiry is stored as
+        remaining seconds, since monotonic clock readings mean nothing after a
+        restart. `version` identifies what produced the values; load() ignores
+        a file saved under a different one.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entries = [
+                [key, value, None if expires_at is None else expires_at - now]
+                for key, (value, expires_at) in self._data.items()
+                if expires_at is None or expires_at > now
+            ]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": version, "entries": entries}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        return len(entries)
+
+    def load(self, path, version=None):
+        """
+        Restore entries written by save() under the same version
+
+        A missing, unreadable or outdated file leaves the cache as it is.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                saved = json.load(f)
+            if not isinstance(saved, dict) or saved.get("version") != version:
+                print(f"Cache file {path} ignored: saved by a different version")
+                return 0
+            entries = saved["entries"]
+        except (OSError, ValueError, KeyError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Cache file {path} not loaded: {e}")
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            for key, value, remaining in entries[-self.maxsize:] if self.maxsize > 0 else ():
+                if remaining is not None and remaining <= 0:
+                    continue
+                # Never keep an entry longer than the current ttl allows
+                if not self.ttl:
+                    expires_at = None
+                else:
+                    expires_at = now + (self.ttl if remaining is None else min(remaining, self.ttl))
+                self._data[key] = (value, expires_at)
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return len(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Return hit/miss counters for the metrics endpoint"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,77 @@
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+class CircuitBreaker:
+    """
+    Fails fast after repeated upstream errors
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    are refused for `reset_timeout` seconds. Then a single probe call is let
+    through: success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._counts = {"successes": 0, "failures": 0, "rejected": 0, "opened": 0}
+
+    def is_open(self):
+        """True while calls are being refused, without claiming a probe"""
+        return self.state == OPEN and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def allow(self):
+        """True if a call may go to the upstream now"""
+        if self.state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self._counts["rejected"] += 1
+        return False
+
+    def record_success(self):
+        self._counts["successes"] += 1
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+        self.state = CLOSED
+
+    def record_failure(self):
+        self._counts["failures"] += 1
+        self._consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self._counts["opened"] += 1
+            self.state = OPEN
+            self._opened_at = time.monotonic()
+
+    def release(self):
+        """Give up a call without an outcome (e.g. it was cancelled)"""
+        self._probe_in_flight = False
+
+    def stats(self):
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = round(max(self.reset_timeout - (time.monotonic() - self._opened_at), 0.0), 3)
+        return {
+            "name": self.name,
+            "state": self.state,
+            "consecutive_failures": self._consecutive_failures,
+            "retry_in_seconds": retry_in,
+            **self._counts,
+        }
@@ -0,0 +1,136 @@
+"""
+Persistent cache for flavor data fetched from the external API
+
+Backed by SQLite in WAL mode so any number of worker processes can read and
+write it at once. Every write is a single-row upsert in its own transaction,
+so a crash can never leave a half-written file and concurrent writers never
+overwrite each other's keys. Entries carry fetch time, expiry and last access
+so stale data can be refreshed and cold data evicted.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS flavor_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS flavor_cache_last_access ON flavor_cache (last_access);
+"""
+
+# How long a statement waits for another process's write lock, in milliseconds
+BUSY_TIMEOUT_MS = 30000
+
+def connect(path, schema):
+    """Open a connection to a shared SQLite file in WAL mode and apply schema"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.executescript(schema)
+    return conn
+
+# Refreshing last_access on every read would turn reads into writes
+ACCESS_RESOLUTION_SECONDS = 60
+# The last_access bump never waits for another writer's lock
+ACCESS_BUSY_TIMEOUT_MS = 0
+
+class PersistentFlavorCache:
+    def __init__(self, path, ttl=7 * 24 * 3600, max_entries=10000, evict_every=100):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path, SCHEMA)
+        return conn
+
+    def get_entry(self, key):
+        """
+        Return (value, is_stale) for key, or None if it was never cached
+
+        Expired entries are still returned (flagged stale) so callers can serve
+        them while refreshing.
+        """
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, expires_at, last_access FROM flavor_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, expires_at, last_access = row
+        now = time.time()
+        if now - last_access > ACCESS_RESOLUTION_SECONDS:
+            conn.execute(f"PRAGMA busy_timeout = {ACCESS_BUSY_TIMEOUT_MS}")
+            try:
+                conn.execute("UPDATE flavor_cache SET last_access = ? WHERE key = ?", (now, key))
+            except sqlite3.OperationalError:
+                pass  # access metadata is best effort; skip it while another writer holds the lock
+            finally:
+                conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        return json.loads(value), expires_at <= now
+
+    def put(self, key, value):
+        """Insert or replace a single key atomically"""
+        now = time.time()
+        self._connection().execute(
+            """
+            INSERT INTO flavor_cache (key, value, fetched_at, expires_at, last_access)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (key) DO UPDATE SET
+                value = excluded.value,
+                fetched_at = excluded.fetched_at,
+                expires_at = excluded.expires_at,
+                last_access = excluded.last_access
+            """,
+            (key, json.dumps(value), now, now + self.ttl, now)
+        )
+
+        with self._writes_lock:
+            self._writes += 1
+            evict = self.evict_every and self._writes % self.evict_every == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        """Drop the least recently used entries beyond max_entries"""
+        if not self.max_entries:
+            return 0
+        cursor = self._connection().execute(
+            """
+            DELETE FROM flavor_cache WHERE key IN (
+                SELECT key FROM flavor_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,)
+        )
+        return cursor.rowcount
+
+    def stats(self):
+        now = time.time()
+        total, expired = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(expires_at <= ?), 0) FROM flavor_cache", (now,)
+        ).fetchone()
+        return {"path": self.path, "entries": total, "expired": expired,
+                "ttl_seconds": self.ttl, "max_entries": self.max_entries}
+
+# Report and evict
+if __name__ == "__main__":
+    from app.config import FLAVOR_CACHE_PATH, FLAVOR_CACHE_TTL, FLAVOR_CACHE_MAX_ENTRIES
+
+    cache = PersistentFlavorCache(FLAVOR_CACHE_PATH, FLAVOR_CACHE_TTL, FLAVOR_CACHE_MAX_ENTRIES)
+    print(f"Evicted {cache.evict()} entries")
+    print(cache.stats())
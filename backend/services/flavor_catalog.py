@@ -0,0 +1,113 @@
+"""
+Local snapshot of the full upstream flavor catalogue
+
+A background prefetch walks every upstream page and replaces the snapshot in
+one transaction, so readers always see a complete catalogue. Each snapshot has
+a content version that, with the page position and size, makes a stable ETag.
+Cursors carry the version they were issued for, so a client paging through
+one snapshot is told when a refresh replaced it instead of silently skipping
+or repeating items.
+"""
+import base64
+import hashlib
+import json
+import threading
+import time
+from services.flavor_cache import connect
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS flavor_catalog (
+    position INTEGER PRIMARY KEY,
+    item TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS flavor_catalog_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+def encode_cursor(version, position):
+    return base64.urlsafe_b64encode(f"v:{version}:p:{position}".encode()).decode().rstrip("=")
+
+def decode_cursor(cursor):
+    """
+    (snapshot version, position) the next page starts after; raises ValueError on a bad cursor
+
+    No cursor means the first page of whatever snapshot is current: (None, 0).
+    """
+    if not cursor:
+        return None, 0
+    try:
+        text = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except Exception:
+        raise ValueError("Invalid cursor")
+    parts = text.split(":")
+    if len(parts) != 4 or parts[0] != "v" or not parts[1] or parts[2] != "p" or not parts[3].isdigit():
+        raise ValueError("Invalid cursor")
+    return parts[1], int(parts[3])
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header value covers etag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or etag in (tag[2:] for tag in candidates if tag.startswith("W/"))
+
+class FlavorCatalog:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path, SCHEMA)
+        return conn
+
+    def meta(self):
+        """{"version", "count", "refreshed_at"} of the current snapshot, or {} if there is none"""
+        meta = dict(self._connection().execute("SELECT key, value FROM flavor_catalog_meta"))
+        if "version" not in meta:
+            return {}
+        return {"version": meta["version"], "count": int(meta["count"]), "refreshed_at": float(meta["refreshed_at"])}
+
+    def replace(self, items):
+        """Swap in a new snapshot atomically; returns its version"""
+        encoded = [json.dumps(item, sort_keys=True) for item in items]
+        version = hashlib.sha1("\n".join(encoded).encode()).hexdigest()[:16]
+
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM flavor_catalog")
+            conn.executemany("INSERT INTO flavor_catalog (position, item) VALUES (?, ?)",
+                             enumerate(encoded, start=1))
+            conn.executemany("INSERT OR REPLACE INTO flavor_catalog_meta (key, value) VALUES (?, ?)", [
+                ("version", version), ("count", str(len(encoded))), ("refreshed_at", str(time.time()))
+            ])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return version
+
+    def page(self, after, limit):
+        """
+        Up to `limit` items following position `after`, read from one snapshot
+
+        Returns (meta, encoded_items, next_after); next_after is None on the
+        last page and meta is {} if nothing has been prefetched yet. Items are
+        returned as stored JSON text so they can be streamed as-is.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN")
+        try:
+            meta = self.meta()
+            rows = conn.execute(
+                "SELECT position, item FROM flavor_catalog WHERE position > ? ORDER BY position LIMIT ?",
+                (after, limit + 1)
+            ).fetchall()
+        finally:
+            conn.execute("COMMIT")
+        next_after = rows[limit - 1][0] if len(rows) > limit else None
+        return meta, [item for _, item in rows[:limit]], next_after
@@ -0,0 +1,79 @@
+import json
+import os
+import threading
+from app.config import FLAVOR_CACHE_PATH, FLAVOR_CACHE_TTL, FLAVOR_CACHE_MAX_ENTRIES
+from services.flavor_cache import PersistentFlavorCache
+from ml.flavor_records import FlavorRecordFile, FLAVOR_RECORDS_PATH
+
+ML_DIR = os.path.join(os.path.dirname(__file__), "..", "ml")
+# Journal written by earlier versions; imported into the persistent cache once
+FLAVOR_JOURNAL_PATH = os.path.join(ML_DIR, "flavor_db.journal.jsonl")
+
+class FlavorStore:
+    """
+    Flavor database for a process
+
+    The read-only base snapshot (flavor_db.flvr) is memory-mapped on first use
+    and its records are decoded only when looked up. Data fetched from the
+    external API lives in a persistent cache that is safe to share between
+    worker processes.
+    """
+
+    def __init__(self, snapshot_path=FLAVOR_RECORDS_PATH, cache=None, journal_path=FLAVOR_JOURNAL_PATH):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.cache = cache or PersistentFlavorCache(FLAVOR_CACHE_PATH, FLAVOR_CACHE_TTL, FLAVOR_CACHE_MAX_ENTRIES)
+        self._data = None
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if self._data is not None:
+            return
+        with self._lock:
+            if self._data is not None:
+                return
+            data = {}
+            try:
+                if os.path.exists(self.snapshot_path):
+                    data = FlavorRecordFile(self.snapshot_path)
+            except Exception as e:
+                print(f"Error reading local flavor database: {e}")
+            self._import_journal()
+            self._data = data
+
+    def _import_journal(self):
+        """Move entries from the legacy append-only journal into the cache"""
+        try:
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.cache.put(entry["key"], entry["value"])
+                    except (ValueError, KeyError, TypeError):
+                        print("Skipping corrupt flavor journal entry")
+            os.remove(self.journal_path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Error importing flavor journal: {e}")
+
+    def get_entry(self, key):
+        """
+        Return (value, is_stale) for key, or None
+
+        Snapshot entries never go stale; cached API responses past their TTL
+        are returned with is_stale set so they can be served while refreshing.
+        """
+        self._ensure_loaded()
+        value = self._data.get(key)
+        if value is not None:
+            return value, False
+        try:
+            return self.cache.get_entry(key)
+        except Exception as e:
+            print(f"Error reading flavor cache: {e}")
+            return None
+
+    def put(self, key, value):
+        """Persist an entry fetched from the external API"""
+        self.cache.put(key, value)
@@ -0,0 +1,141 @@
+import numpy as np
+
+# Fixed order of the flavor vector dimensions
+DIMENSIONS = ("sweet", "sour", "bitter", "salty", "umami", "spicy", "intensity")
+
+# ml/flavor_database.py taste_profile keys mapped onto DIMENSIONS
+TASTE_PROFILE_DIMENSIONS = {
+    "sweetness": "sweet",
+    "acidity": "sour",
+    "bitterness": "bitter",
+    "umami": "umami",
+    "intensity": "intensity",
+}
+
+# Dimensions scoring at least this fraction of the top score count as dominant
+DOMINANCE_RATIO = 0.8
+
+def _recipe_items(ingredients):
+    """
+    Names and weights of a recipe's items
+
+    Items are ingredient names or {"ingredient": ..., "amount": ...} dicts;
+    a missing amount (and a bare name) counts as 100g, as in the calorie service.
+    Items that cannot be used are returned as {"item", "error"} entries.
+    """
+    names, weights, invalid = [], [], []
+    for item in ingredients:
+        if isinstance(item, dict):
+            name, amount = item.get("ingredient"), item.get("amount", 100)
+        else:
+            name, amount = item, 100
+        if not isinstance(name, str) or not name.strip():
+            invalid.append({"item": item, "error": "Ingredient name is required"})
+        elif isinstance(amount, bool) or not isinstance(amount, (int, float)) or not amount > 0:
+            invalid.append({"item": item, "error": "Amount must be a positive number"})
+        else:
+            names.append(name.lower().strip())
+            weights.append(float(amount))
+    return names, weights, invalid
+
+class FlavorVectorEngine:
+    """
+    Fixed-length flavor vectors for known ingredients
+
+    Scores are held in an (ingredients x dimensions) matrix with a parallel
+    mask of which scores are known, so a recipe profile is a weighted average
+    over the ingredients that actually score each dimension. A batch of
+    recipes is one sparse (recipes x ingredients) weight matrix multiplied by
+    the score and mask matrices.
+    """
+
+    def __init__(self, profiles):
+        self.names = list(profiles)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.values = np.zeros((len(self.names), len(DIMENSIONS)))
+        self.mask = np.zeros((len(self.names), len(DIMENSIONS)))
+        columns = {dimension: j for j, dimension in enumerate(DIMENSIONS)}
+        for i, name in enumerate(self.names):
+            for dimension, score in profiles[name].items():
+                self.values[i, columns[dimension]] = score
+                self.mask[i, columns[dimension]] = 1.0
+
+    @classmethod
+    def from_reference(cls, local_db, flavor_database):
+        """
+        Merge LOCAL_FLAVOR_DB flavor_profile scores with ml/flavor_database.py
+        taste_profile scores; the curated local scores win where both exist
+        """
+        profiles = {}
+        for name, entry in flavor_database.items():
+            profiles[name] = {
+                TASTE_PROFILE_DIMENSIONS[key]: score
+                for key, score in entry.get("taste_profile", {}).items()
+                if key in TASTE_PROFILE_DIMENSIONS
+            }
+        for name, entry in local_db.items():
+            profiles.setdefault(name, {}).update(
+                (key, score) for key, score in entry.get("flavor_profile", {}).items() if key in DIMENSIONS
+            )
+        return cls(profiles)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _weights(self, recipes):
+        """Sparse (recipes x ingredients) weights plus the unmatched names and invalid items of each recipe"""
+        from scipy import sparse
+
+        rows, cols, data, unmatched, invalid = [], [], [], [], []
+        for r, ingredients in enumerate(recipes):
+            names, weights, rejected = _recipe_items(ingredients)
+            invalid.append(rejected)
+            missing = []
+            for name, weight in zip(names, weights):
+                i = self.ids.get(name)
+                if i is None:
+                    missing.append(name)
+                else:
+                    rows.append(r)
+                    cols.append(i)
+                    data.append(weight)
+            unmatched.append(missing)
+        weights = sparse.csr_matrix((data, (rows, cols)), shape=(len(recipes), len(self.names)))
+        return weights, unmatched, invalid
+
+    def profile_matrix(self, recipes):
+        """
+        Weighted mean profile of each recipe as a (recipes x dimensions) array
+
+        Dimensions no matched ingredient scores are 0. Also returns the
+        unmatched ingredient names and the invalid items per recipe.
+        """
+        weights, unmatched, invalid = self._weights(recipes)
+        totals = np.asarray(weights @ self.values)
+        coverage = np.asarray(weights @ self.mask)
+        profiles = np.divide(totals, coverage, out=np.zeros_like(totals), where=coverage > 0)
+        return profiles, unmatched, invalid
+
+    def profile_batch(self, recipes):
+        """Dense profile and dominant dimensions for each recipe"""
+        profiles, unmatched, invalid = self.profile_matrix(recipes)
+        order = np.argsort(-profiles, axis=1, kind="stable")
+        top = profiles.max(axis=1, initial=0.0)
+        dominant = (profiles >= DOMINANCE_RATIO * top[:, None]) & (top[:, None] > 0)
+
+        results = []
+        for vector, ranked, is_dominant, missing, rejected in zip(
+            np.round(profiles, 4).tolist(), order.tolist(), dominant.tolist(), unmatched, invalid
+        ):
+            results.append({
+                "dimensions": list(DIMENSIONS),
+                "vector": vector,
+                "profile": dict(zip(DIMENSIONS, vector)),
+                "dominant_dimensions": [DIMENSIONS[j] for j in ranked if is_dominant[j]],
+                "unmatched_ingredients": missing,
+                "invalid_items": rejected,
+            })
+        return results
+
+    def profile(self, ingredients):
+        return self.profile_batch([ingredients])[0]
@@ -1,9 +1,70 @@
-import pickle
-import os
-import requests
-from app.config import FOODOSCOPE_API_KEY
+import asyncio
+import json
+import time
+import httpx
+from app.config import (FOODOSCOPE_API_KEY, FLAVOR_API_BASE_URL, FLAVOR_CACHE_PATH,
+                        FLAVOR_PREFETCH_PAGE_SIZE, FLAVOR_PREFETCH_MAX_PAGES,
+                        FLAVOR_BREAKER_FAILURES, FLAVOR_BREAKER_RESET_SECONDS)
+from app.reference_data import LOCAL_FLAVOR_DB, FLAVOR_CATEGORIES
+from services.flavor_store import FlavorStore
+from services.flavor_catalog import FlavorCatalog, decode_cursor, encode_cursor
+from services.http_client import http_client
+from services.single_flight import SingleFlight
+from services.circuit_breaker import CircuitBreaker, CircuitOpenError
+from services.flavor_vectors import FlavorVectorEngine
+from services.pairing_graph import build_pairing_graph
+from ml.flavor_database import flavor_data
 
-def get_flavor_data(ingredient):
+# flavor_db.flvr memory-mapped plus the persistent cache of API responses
+flavor_store = FlavorStore()
+
+# Concurrent misses for the same ingredient share one upstream call and cache write
+flavor_fetches = SingleFlight()
+
+# Full upstream catalogue, refreshed in the background and served by /flavors
+flavor_catalog = FlavorCatalog(FLAVOR_CACHE_PATH)
+prefetch_stats = {"runs": 0, "failures": 0, "last_error": None, "last_pages": 0, "last_count": 0}
+
+# Fail fast while the upstream is down; expired cache entries are served meanwhile
+flavor_breaker = CircuitBreaker("flavor_api", FLAVOR_BREAKER_FAILURES, FLAVOR_BREAKER_RESET_SECONDS)
+revalidation_stats = {"stale_served": 0, "refreshes": 0, "fail_fast": 0}
+_refresh_tasks = set()
+
+FLAVOR_API_URL = f"{FLAVOR_API_BASE_URL}/ingredients/flavor/Herbs%20and%20Spices"
+
+def _api_headers():
+    headers = {}
+    if FOODOSCOPE_API_KEY != "your_api_key_here":
+        headers["Authorization"] = f"Bearer {FOODOSCOPE_API_KEY}"
+    return headers
+
+async def _call_upstream(params):
+    """
+    GET the flavor API through the circuit breaker
+
+    Timeouts, connection errors, 5xx responses and unreadable bodies count as
+    failures; 4xx responses mean the upstream is healthy.
+    """
+    if not flavor_breaker.allow():
+        raise CircuitOpenError("Flavor service temporarily unavailable")
+    try:
+        body = await http_client.get_json(FLAVOR_API_URL, params=params, headers=_api_headers())
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code >= 500:
+            flavor_breaker.record_failure()
+        else:
+            flavor_breaker.record_success()
+        raise
+    except (httpx.HTTPError, ValueError):
+        flavor_breaker.record_failure()
+        raise
+    except BaseException:
+        flavor_breaker.release()
+        raise
+    flavor_breaker.record_success()
+    return body
+
+async def get_flavor_data(ingredient):
     """
     Get flavor data from local database or fallback to external API
     """
@@ -12,231 +73,182 @@ def get_flavor_data(ingredient):
     
     ingredient = ingredient.lower().strip()
     
-    # Create local flavor database with common ingredients
-    local_flavor_db = {
-        "lemon": {
-            "flavor_profile": {
-                "sweet": 2,
-                "sour": 8,
-                "bitter": 1,
-                "salty": 1,
-                "umami": 1,
-                "spicy": 0
-            },
-            "description": "Citrus fruit with bright, acidic flavor",
-            "aroma": "Fresh, zesty, citrusy",
-            "pairings": ["honey", "mint", "basil", "ginger", "garlic", "olive oil"],
-            "categories": ["citrus", "sour", "fresh"]
-        },
-        "garlic": {
-            "flavor_profile": {
-                "sweet": 0,
-                "sour": 1,
-                "bitter": 2,
-                "salty": 1,
-                "umami": 6,
-                "spicy": 3
-            },
-            "description": "Pungent bulb with strong savory flavor",
-            "aroma": "Strong, pungent, aromatic",
-            "pairings": ["lemon", "herbs", "onion", "tomato", "olive oil", "butter"],
-            "categories": ["allium", "savory", "aromatic"]
-        },
-        "vanilla": {
-            "flavor_profile": {
-                "sweet": 9,
-                "sour": 1,
-                "bitter": 1,
-                "salty": 0,
-                "umami": 2,
-                "spicy": 0
-            },
-            "description": "Sweet, aromatic orchid pod",
-            "aroma": "Sweet, creamy, warm, comforting",
-            "pairings": ["chocolate", "coffee", "caramel", "berries", "nuts"],
-            "categories": ["sweet", "aromatic", "comforting"]
-        },
-        "chocolate": {
-            "flavor_profile": {
-                "sweet": 8,
-                "sour": 2,
-                "bitter": 6,
-                "salty": 1,
-                "umami": 3,
-                "spicy": 1
-            },
-            "description": "Rich, sweet cacao product",
-            "aroma": "Rich, sweet, slightly bitter, comforting",
-            "pairings": ["vanilla", "coffee", "nuts", "berries", "caramel"],
-            "categories": ["sweet", "rich", "comforting"]
-        },
-        "honey": {
-            "flavor_profile": {
-                "sweet": 9,
-                "sour": 2,
-                "bitter": 1,
-                "salty": 0,
-                "umami": 1,
-                "spicy": 0
-            },
-            "description": "Natural sweet syrup from bees",
-            "aroma": "Sweet, floral, warm, golden",
-            "pairings": ["lemon", "tea", "herbs", "cheese", "nuts"],
-            "categories": ["sweet", "natural", "floral"]
-        },
-        "basil": {
-            "flavor_profile": {
-                "sweet": 1,
-                "sour": 1,
-                "bitter": 2,
-                "salty": 0,
-                "umami": 3,
-                "spicy": 0
-            },
-            "description": "Aromatic herb with sweet, peppery flavor",
-            "aroma": "Fresh, herbal, slightly sweet, peppery",
-            "pairings": ["tomato", "garlic", "lemon", "olive oil", "cheese"],
-            "categories": ["herb", "aromatic", "fresh"]
-        },
-        "ginger": {
-            "flavor_profile": {
-                "sweet": 2,
-                "sour": 2,
-                "bitter": 1,
-                "salty": 0,
-                "umami": 2,
-                "spicy": 7
-            },
-            "description": "Spicy, pungent root with zesty flavor",
-            "aroma": "Spicy, warm, zesty, slightly sweet",
-            "pairings": ["lemon", "garlic", "honey", "soy sauce", "coconut"],
-            "categories": ["spicy", "root", "zesty"]
-        },
-        "cinnamon": {
-            "flavor_profile": {
-                "sweet": 8,
-                "sour": 1,
-                "bitter": 2,
-                "salty": 0,
-                "umami": 2,
-                "spicy": 8
-            },
-            "description": "Sweet, spicy bark with warm aroma",
-            "aroma": "Sweet, spicy, warm, woody, comforting",
-            "pairings": ["apple", "coffee", "nuts", "vanilla", "chocolate"],
-            "categories": ["spice", "sweet", "warm"]
-        }
-    }
-    
     # Check local database first
-    if ingredient in local_flavor_db:
-        return local_flavor_db[ingredient]
+    if ingredient in LOCAL_FLAVOR_DB:
+        return LOCAL_FLAVOR_DB[ingredient]
     
-    # Try local database file next
-    try:
-        flavor_db_path = os.path.join(os.path.dirname(__file__), "..", "ml", "flavor_db.pkl")
-        if os.path.exists(flavor_db_path):
-            with open(flavor_db_path, 'rb') as f:
-                flavor_db = pickle.load(f)
-            
-            if ingredient in flavor_db:
-                return flavor_db[ingredient]
-    except Exception as e:
-        print(f"Error reading local flavor database: {e}")
+    # Then the local database file and the persistent cache of API responses,
+    # read off the event loop since SQLite may wait on another process's lock
+    entry = await asyncio.to_thread(flavor_store.get_entry, ingredient)
+    if entry is not None:
+        value, is_stale = entry
+        if is_stale:
+            # Serve the expired copy now and refresh it in the background
+            revalidation_stats["stale_served"] += 1
+            _start_refresh(ingredient)
+        return value
     
     # Fallback to external API
+    if flavor_breaker.is_open():
+        revalidation_stats["fail_fast"] += 1
+        return {"error": "Failed to fetch flavor data: flavor service temporarily unavailable"}
+    return await flavor_fetches.do(ingredient, lambda: _fetch_flavor_data(ingredient))
+
+def _start_refresh(ingredient):
+    """Refresh a stale entry in the background, at most once at a time per ingredient"""
+    if flavor_breaker.is_open():
+        return
+    revalidation_stats["refreshes"] += 1
+    task = asyncio.ensure_future(flavor_fetches.do(ingredient, lambda: _fetch_flavor_data(ingredient)))
+    _refresh_tasks.add(task)
+    task.add_done_callback(_refresh_tasks.discard)
+
+async def _fetch_flavor_data(ingredient):
+    """Fetch flavor data from the external API and cache it"""
     try:
-        # Use the new API URL you provided
-        api_url = "https://example.com/recipe2-api/ingredients/flavor/Herbs%20and%20Spices?page=1&limit=50"
-        
-        headers = {}
-        if FOODOSCOPE_API_KEY != "your_api_key_here":
-            headers["Authorization"] = f"Bearer {FOODOSCOPE_API_KEY}"
-        
-        response = requests.get(api_url, headers=headers, timeout=10)
-        response.raise_for_status()
+        data = await _call_upstream({"page": 1, "limit": 50})
         
-        data = response.json()
-        
-        # Cache the response locally
+        # Cache the response locally, off the event loop
         try:
-            flavor_db_path = os.path.join(os.path.dirname(__file__), "..", "ml", "flavor_db.pkl")
-            if os.path.exists(os.path.dirname(flavor_db_path)):
-                with open(flavor_db_path, 'rb') as f:
-                    flavor_db = pickle.load(f)
-            else:
-                flavor_db = {}
-            
-            flavor_db[ingredient] = data
-            with open(flavor_db_path, 'wb') as f:
-                pickle.dump(flavor_db, f)
+            await asyncio.to_thread(flavor_store.put, ingredient, data)
         except Exception as e:
             print(f"Error caching flavor data: {e}")
         
         return data
         
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, CircuitOpenError) as e:
         return {"error": f"Failed to fetch flavor data: {str(e)}"}
     except Exception as e:
         return {"error": f"Unexpected error: {str(e)}"}
 
-def get_all_flavors():
+async def get_all_flavors():
     """
     Get all flavors from the external API
     """
     try:
-        api_url = "https://example.com/recipe2-api/ingredients/flavor/Herbs%20and%20Spices?page=1&limit=50"
-        
-        headers = {}
-        if FOODOSCOPE_API_KEY != "your_api_key_here":
-            headers["Authorization"] = f"Bearer {FOODOSCOPE_API_KEY}"
-        
-        response = requests.get(api_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        return await _call_upstream({"page": 1, "limit": 50})
         
-    except requests.exceptions.RequestException as e:
+    except (httpx.HTTPError, CircuitOpenError) as e:
         return {"error": f"Failed to fetch flavor data: {str(e)}"}
     except Exception as e:
         return {"error": f"Unexpected error: {str(e)}"}
 
-def get_flavor_categories():
+def _page_items(body):
+    """Items of one upstream page, whether it is a bare list or wrapped in an object"""
+    if isinstance(body, list):
+        return body
+    if isinstance(body, dict):
+        for key in ("data", "items", "results"):
+            if isinstance(body.get(key), list):
+                return body[key]
+    return []
+
+async def prefetch_flavor_catalog(page_size=FLAVOR_PREFETCH_PAGE_SIZE, max_pages=FLAVOR_PREFETCH_MAX_PAGES):
     """
-    Get flavor categories and their descriptions
+    Walk every upstream page into the local catalogue snapshot
     """
-    return {
-        "sweet": {
-            "description": "Sweet flavors like sugar, honey, vanilla",
-            "ingredients": ["sugar", "honey", "vanilla", "maple syrup", "agave"],
-            "pairings": ["citrus", "nuts", "spices"]
-        },
-        "sour": {
-            "description": "Sour flavors like lemon, vinegar, yogurt",
-            "ingredients": ["lemon", "lime", "vinegar", "yogurt", "tamarind"],
-            "pairings": ["sweet", "herbs", "fatty"]
-        },
-        "salty": {
-            "description": "Salty flavors like salt, soy sauce, cheese",
-            "ingredients": ["salt", "soy sauce", "cheese", "bacon", "olives"],
-            "pairings": ["sweet", "acidic", "herbs"]
-        },
-        "bitter": {
-            "description": "Bitter flavors like coffee, dark chocolate, greens",
-            "ingredients": ["coffee", "dark chocolate", "kale", "broccoli", "grapefruit"],
-            "pairings": ["sweet", "fatty", "creamy"]
-        },
-        "umami": {
-            "description": "Umami flavors like mushrooms, soy, aged cheese",
-            "ingredients": ["mushrooms", "soy sauce", "parmesan", "tomato", "seaweed"],
-            "pairings": ["salty", "acidic", "fatty"]
-        },
-        "spicy": {
-            "description": "Spicy flavors like chili, pepper, ginger",
-            "ingredients": ["chili", "black pepper", "ginger", "wasabi", "horseradish"],
-            "pairings": ["cooling", "creamy", "sweet"]
+    items = []
+    pages = 0
+    for page in range(1, max_pages + 1):
+        body = await _call_upstream({"page": page, "limit": page_size})
+        batch = _page_items(body)
+        pages += 1
+        items.extend(batch)
+        if len(batch) < page_size:
+            break
+
+    version = await asyncio.to_thread(flavor_catalog.replace, items)
+    prefetch_stats.update(last_pages=pages, last_count=len(items))
+    return {"version": version, "count": len(items), "pages": pages}
+
+async def run_flavor_prefetch(interval):
+    """
+    Keep the catalogue snapshot no older than `interval` seconds; runs until cancelled
+
+    The snapshot is shared by all workers, so a worker skips the walk when
+    another one refreshed it recently.
+    """
+    while True:
+        meta = await asyncio.to_thread(flavor_catalog.meta)
+        age = time.time() - meta.get("refreshed_at", 0)
+        if age < interval:
+            await asyncio.sleep(interval - age)
+            continue
+
+        prefetch_stats["runs"] += 1
+        try:
+            result = await prefetch_flavor_catalog()
+            print(f"Flavor catalogue refreshed: {result['count']} items from {result['pages']} pages")
+            await asyncio.sleep(interval)
+        except Exception as e:
+            prefetch_stats["failures"] += 1
+            prefetch_stats["last_error"] = str(e)
+            print(f"Flavor catalogue prefetch failed: {e}")
+            await asyncio.sleep(min(interval, 60))
+
+async def get_flavor_page(cursor=None, limit=50):
+    """
+    One page of the local catalogue snapshot
+
+    Returns None if nothing has been prefetched yet. The ETag depends only on
+    the snapshot version and the page requested. A cursor issued for an older
+    snapshot gets an error telling the client to start again from the first page.
+    """
+    try:
+        version, after = decode_cursor(cursor)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    meta, items, next_after = await asyncio.to_thread(flavor_catalog.page, after, limit)
+    if not meta:
+        return None
+    if version is not None and version != meta["version"]:
+        return {
+            "error": "The flavor catalogue was refreshed since this cursor was issued; restart from the first page",
+            "version": meta["version"],
         }
+    return {
+        "version": meta["version"],
+        "total": meta["count"],
+        "items": items,
+        "next_cursor": encode_cursor(meta["version"], next_after) if next_after is not None else None,
+        "etag": f'"{meta["version"]}-{after}-{limit}"',
     }
 
+def stream_flavor_page(page):
+    """Yield a page as JSON text, one stored item at a time"""
+    header = {key: page[key] for key in ("version", "total", "next_cursor")}
+    yield json.dumps(header)[:-1] + ', "items": ['
+    for i, item in enumerate(page["items"]):
+        yield ("," if i else "") + item
+    yield "]}"
+
+def _build_category_index(categories):
+    """Map each lowercased member ingredient to its categories, in category order"""
+    index = {}
+    for category, data in categories.items():
+        for ingredient in data["ingredients"]:
+            members = index.setdefault(ingredient.lower(), [])
+            if category not in members:
+                members.append(category)
+    return {ingredient: tuple(members) for ingredient, members in index.items()}
+
+# Built once from the static categories so profiles are linear in the input size
+CATEGORY_INDEX = _build_category_index(FLAVOR_CATEGORIES)
+CATEGORY_PAIRINGS = {category: frozenset(data["pairings"]) for category, data in FLAVOR_CATEGORIES.items()}
+
+# Numeric flavor vectors from the curated flavor_profile and taste_profile scores
+flavor_vectors = FlavorVectorEngine.from_reference(LOCAL_FLAVOR_DB, flavor_data)
+
+# Every pairing source merged into one sparse ingredient graph
+pairing_graph = build_pairing_graph(LOCAL_FLAVOR_DB, flavor_data, FLAVOR_CATEGORIES)
+
+def get_flavor_categories():
+    """
+    Get flavor categories and their descriptions
+    """
+    return FLAVOR_CATEGORIES
+
 def get_flavor_pairings(flavor_category):
     """
     Get recommended pairings for a specific flavor category
@@ -253,7 +265,6 @@ def analyze_flavor_profile(ingredients):
     if not ingredients:
         return {"error": "Ingredients list is required"}
     
-    categories = get_flavor_categories()
     profile = {
         "ingredients": ingredients,
         "flavor_breakdown": {},
@@ -261,25 +272,79 @@ def analyze_flavor_profile(ingredients):
         "pairing_suggestions": []
     }
     
-    flavor_counts = {}
+    flavor_counts = profile["flavor_breakdown"]
     for ingredient in ingredients:
-        ingredient_lower = ingredient.lower()
-        for category, data in categories.items():
-            if ingredient_lower in [ing.lower() for ing in data["ingredients"]]:
-                flavor_counts[category] = flavor_counts.get(category, 0) + 1
-                profile["flavor_breakdown"][category] = profile["flavor_breakdown"].get(category, 0) + 1
+        for category in CATEGORY_INDEX.get(ingredient.lower(), ()):
+            flavor_counts[category] = flavor_counts.get(category, 0) + 1
     
     # Determine dominant flavors
     if flavor_counts:
         max_count = max(flavor_counts.values())
         profile["dominant_flavors"] = [flavor for flavor, count in flavor_counts.items() if count == max_count]
         
-        # Get pairings for dominant flavors
-        for dominant_flavor in profile["dominant_flavors"]:
-            if dominant_flavor in categories:
-                profile["pairing_suggestions"].extend(categories[dominant_flavor]["pairings"])
-        
-        # Remove duplicates
-        profile["pairing_suggestions"] = list(set(profile["pairing_suggestions"]))
+        # Union of the precomputed pairing sets of the dominant flavors
+        profile["pairing_suggestions"] = sorted(
+            frozenset().union(*(CATEGORY_PAIRINGS[flavor] for flavor in profile["dominant_flavors"]))
+        )
     
     return profile
+
+def get_flavor_vector(ingredients):
+    """
+    Weighted flavor vector of a recipe
+    
+    ingredients are names or {'ingredient', 'amount'} dictionaries; amounts
+    weight each ingredient's scores (100g when not given). Items without a
+    name or with a non-positive amount are listed in invalid_items.
+    """
+    if not ingredients:
+        return {"error": "Ingredients list is required"}
+    return flavor_vectors.profile(ingredients)
+
+def get_flavor_vectors_batch(recipes):
+    """
+    Flavor vectors for many recipes in one vectorized call (e.g. a whole catalogue)
+    """
+    if not recipes:
+        return {"error": "Recipes list is required"}
+    results = flavor_vectors.profile_batch([recipe if isinstance(recipe, list) else [] for recipe in recipes])
+    for i, recipe in enumerate(recipes):
+        if not isinstance(recipe, list):
+            results[i] = {"error": "Recipe must be a list of ingredients"}
+    return {"recipes": results, "count": len(results)}
+
+def expand_pairings(ingredients, hops=2, limit=20):
+    """
+    Ingredients that pair with the given ones, up to `hops` pairings away
+    """
+    if not ingredients:
+        return {"error": "Ingredients list is required"}
+    seeds, unmatched = pairing_graph.resolve(ingredients)
+    if not seeds:
+        return {"error": "No pairing data found for the given ingredients", "unmatched_ingredients": unmatched}
+    
+    return {
+        "pairings": [
+            {"ingredient": name, "hops": hop, "score": score}
+            for name, hop, score in pairing_graph.expand(seeds, hops, limit)
+        ],
+        "unmatched_ingredients": unmatched
+    }
+
+def get_best_complements(ingredients, limit=10):
+    """
+    Ingredients that best complement the whole set of given ingredients
+    """
+    if not ingredients:
+        return {"error": "Ingredients list is required"}
+    seeds, unmatched = pairing_graph.resolve(ingredients)
+    if not seeds:
+        return {"error": "No pairing data found for the given ingredients", "unmatched_ingredients": unmatched}
+    
+    return {
+        "complements": [
+            {"ingredient": name, "score": score, "pairs_with": connections}
+            for name, score, connections in pairing_graph.complements(seeds, limit)
+        ],
+        "unmatched_ingredients": unmatched
+    }
@@ -0,0 +1,89 @@
+"""
+Shared async HTTP client for external APIs
+
+One httpx.AsyncClient per process keeps connections alive between requests.
+Total connections are capped by the pool, and each upstream host has its own
+semaphore so a slow host can only hold its share of the pool while requests
+to other hosts keep flowing.
+"""
+import asyncio
+from urllib.parse import urlsplit
+import httpx
+from app.config import HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE, HTTP_PER_HOST_LIMIT, HTTP_TIMEOUT
+
+class PooledHttpClient:
+    def __init__(self, max_connections=100, max_keepalive=20, per_host_limit=10, timeout=10.0):
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive)
+        self.per_host_limit = per_host_limit
+        self.timeout = httpx.Timeout(timeout)
+        self._client = None
+        self._loop = None
+        self._closing = set()
+        self._host_slots = {}
+        self._stats = {"requests": 0, "errors": 0, "in_flight": 0}
+
+    def _get_client(self):
+        # Created lazily so the pool belongs to the running event loop
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            if self._client is not None and not self._client.is_closed:
+                self._close_stale(self._client, self._loop)
+            self._client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout)
+            self._loop = loop
+            self._host_slots = {}
+        return self._client
+
+    def _close_stale(self, client, loop):
+        """Close a client left behind by another event loop, on that loop while it still runs"""
+        if loop is not None and loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+            return
+        # Its loop is gone: close what can still be closed from here
+        task = asyncio.get_running_loop().create_task(self._aclose_quietly(client))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    @staticmethod
+    async def _aclose_quietly(client):
+        try:
+            await client.aclose()
+        except Exception:
+            pass
+
+    def _slots(self, url):
+        host = urlsplit(url).netloc
+        slots = self._host_slots.get(host)
+        if slots is None:
+            slots = self._host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+        return slots
+
+    async def get_json(self, url, params=None, headers=None):
+        """GET url and return the decoded JSON body; raises httpx.HTTPError on failure"""
+        client = self._get_client()
+        async with self._slots(url):
+            self._stats["requests"] += 1
+            self._stats["in_flight"] += 1
+            try:
+                response = await client.get(url, params=params, headers=headers)
+                response.raise_for_status()
+                return response.json()
+            except Exception:
+                self._stats["errors"] += 1
+                raise
+            finally:
+                self._stats["in_flight"] -= 1
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._host_slots = {}
+
+    def stats(self):
+        return {
+            **self._stats,
+            "max_connections": self.limits.max_connections,
+            "per_host_limit": self.per_host_limit,
+        }
+
+http_client = PooledHttpClient(HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE, HTTP_PER_HOST_LIMIT, HTTP_TIMEOUT)
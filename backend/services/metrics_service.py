@@ -0,0 +1,27 @@
+from services.substitution import substitution_cache
+from services.http_client import http_client
+from services.nlp_service import nlp_batcher, nlp_pool, nlp_query_cache
+from services.flavordb_service import flavor_fetches, flavor_catalog, prefetch_stats, flavor_breaker, revalidation_stats
+
+try:
+    from ml.ml_engine import model_registry
+except ImportError as e:
+    print(f"ML engine not available: {e}")
+    model_registry = None
+
+def get_metrics():
+    """
+    Collect runtime counters from the services for the /metrics endpoint
+    """
+    return {
+        "substitution_model": model_registry.stats() if model_registry else None,
+        "substitution_cache": substitution_cache.stats(),
+        "http_client": http_client.stats(),
+        "flavor_single_flight": flavor_fetches.stats(),
+        "flavor_catalog": {**flavor_catalog.meta(), "prefetch": dict(prefetch_stats)},
+        "flavor_circuit_breaker": flavor_breaker.stats(),
+        "flavor_stale_while_revalidate": dict(revalidation_stats),
+        "nlp_query_cache": nlp_query_cache.stats(),
+        "nlp_batcher": nlp_batcher.stats(),
+        "nlp_workers": nlp_pool.stats() if nlp_pool else None
+    }
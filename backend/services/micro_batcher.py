@@ -0,0 +1,121 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+class MicroBatcher:
+    """
+    Groups concurrent single-item calls into batches
+
+    Callers submit one item and get a Future. A worker thread takes the first
+    waiting item, keeps collecting until `window` seconds have passed or
+    `max_batch` items are queued, then runs `process_batch` once on the whole
+    list and resolves each Future with its own result. Under light load a call
+    waits at most `window` longer than running alone; under heavy load the
+    per-batch overhead is shared by up to `max_batch` calls.
+
+    `process_batch` may also return a Future of the results list (e.g. work
+    handed to another process); the worker thread then moves on to collect
+    the next batch. With `max_queue` set, submit raises queue.Full once that
+    many items are waiting rather than letting the backlog grow unbounded.
+    """
+
+    def __init__(self, process_batch, window=0.005, max_batch=64, name="micro-batcher", max_queue=0):
+        self.process_batch = process_batch
+        self.window = window
+        self.max_batch = max_batch
+        self.name = name
+        self.max_queue = max_queue
+        self._queue = queue.Queue(max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats = {"items": 0, "batches": 0, "max_batch_seen": 0, "failed_batches": 0, "rejected": 0}
+
+    def submit(self, item):
+        """Queue one item; returns a concurrent.futures.Future for its result"""
+        self._ensure_started()
+        future = Future()
+        try:
+            self._queue.put_nowait((item, future))
+        except queue.Full:
+            self._stats["rejected"] += 1
+            raise
+        return future
+
+    def run(self, item):
+        """Submit one item and wait for its result"""
+        return self.submit(item).result()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+                    self._thread.start()
+
+    def _loop(self):
+        while True:
+            batch = [self._queue.get()]
+            if batch[0] is None:
+                return
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if entry is None:
+                    self._run_batch(batch)
+                    return
+                batch.append(entry)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        items = [item for item, _ in batch]
+        self._stats["batches"] += 1
+        self._stats["items"] += len(items)
+        self._stats["max_batch_seen"] = max(self._stats["max_batch_seen"], len(items))
+        try:
+            results = self.process_batch(items)
+        except Exception as e:
+            self._fail(batch, e)
+            return
+        if isinstance(results, Future):
+            results.add_done_callback(lambda done: self._resolve(batch, done))
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _resolve(self, batch, done):
+        try:
+            results = done.result()
+        except BaseException as e:
+            self._fail(batch, e)
+            return
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _fail(self, batch, error):
+        self._stats["failed_batches"] += 1
+        for _, future in batch:
+            future.set_exception(error)
+
+    def close(self):
+        """Process anything already queued, then stop the worker thread"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def stats(self):
+        batches = self._stats["batches"]
+        return {
+            **self._stats,
+            "mean_batch_size": round(self._stats["items"] / batches, 2) if batches else 0.0,
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "queued": self._queue.qsize(),
+        }
@@ -0,0 +1,119 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+class NLPBusyError(Exception):
+    """Raised when the NLP workers are saturated or shutting down"""
+
+def _load_worker(profile):
+    # Runs once in each worker process: load the pipeline before the first batch
+    from ml.nlp_engine import get_nlp_engine
+    get_nlp_engine(profile)
+
+def _analyze_in_worker(items, batch_size):
+    from ml.nlp_engine import analyze_batch
+    return analyze_batch(items, batch_size)
+
+class NLPWorkerPool:
+    """
+    spaCy parsing in worker processes, so NLP throughput scales with cores
+
+    Each worker loads its pipeline once at start-up and then parses whole
+    batches of (query, profile) items. At most `max_pending` batches are
+    queued or running at a time; `submit` waits up to `submit_timeout` seconds
+    for a slot and then raises NLPBusyError, so overload turns into fast
+    errors instead of an ever-growing backlog. Workers are spawned rather than
+    forked, because the server process has threads running. A pool whose
+    worker died is replaced on the next submit.
+    """
+
+    def __init__(self, workers, max_pending=None, batch_size=64, submit_timeout=1.0, profile=None):
+        self.workers = workers
+        self.max_pending = max_pending or workers * 2
+        self.batch_size = batch_size
+        self.submit_timeout = submit_timeout
+        self.profile = profile
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._closed = False
+        self._pending = 0
+        self._stats = {"batches": 0, "items": 0, "failed_batches": 0, "rejected": 0, "restarts": 0}
+
+    def _get_executor(self):
+        with self._lock:
+            if self._closed:
+                raise NLPBusyError("NLP workers are shutting down")
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_load_worker,
+                    initargs=(self.profile,)
+                )
+            return self._executor
+
+    def start(self):
+        """Start every worker loading its pipeline now instead of on the first batches"""
+        executor = self._get_executor()
+        # Workers are spawned on demand, one per submit that finds none idle
+        for _ in range(self.workers):
+            executor.submit(_load_worker, self.profile)
+
+    def submit(self, items):
+        """Parse a batch of (query, profile) items in a worker; returns a concurrent.futures.Future"""
+        if not self._slots.acquire(timeout=self.submit_timeout):
+            self._stats["rejected"] += 1
+            raise NLPBusyError(f"NLP workers are busy ({self.max_pending} batches pending)")
+        try:
+            future = self._submit(items)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._pending += 1
+        self._stats["batches"] += 1
+        self._stats["items"] += len(items)
+        future.add_done_callback(self._finish)
+        return future
+
+    def _submit(self, items):
+        executor = self._get_executor()
+        try:
+            return executor.submit(_analyze_in_worker, items, self.batch_size)
+        except BrokenProcessPool:
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+                    self._stats["restarts"] += 1
+            executor.shutdown(wait=False, cancel_futures=True)
+            return self._get_executor().submit(_analyze_in_worker, items, self.batch_size)
+
+    def _finish(self, future):
+        with self._lock:
+            self._pending -= 1
+        if future.cancelled() or future.exception() is not None:
+            self._stats["failed_batches"] += 1
+        self._slots.release()
+
+    def run(self, items):
+        """Submit one batch and wait for its results"""
+        return self.submit(items).result()
+
+    def close(self):
+        """Stop taking batches, let queued and running ones finish, then stop the workers"""
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self):
+        return {
+            **self._stats,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "running": self._executor is not None,
+        }
@@ -1,11 +1,91 @@
-from ml.nlp_engine import nlp_engine
+import asyncio
+import queue
+import re
+from app.config import (
+    NLP_BATCH_WINDOW_MS, NLP_BATCH_SIZE, NLP_WORKERS, NLP_MAX_PENDING_BATCHES,
+    NLP_QUEUE_SIZE, NLP_SUBMIT_TIMEOUT, NLP_PROFILE, NLP_CACHE_SIZE, NLP_CACHE_TTL, NLP_CACHE_PATH
+)
+from app.reference_data import INGREDIENT_ALLERGENS
+from ml.nlp_engine import get_nlp_engine, analyze_batch, suggest_ingredients, parse_fingerprint
+from services.cache import TTLCache
+from services.micro_batcher import MicroBatcher
+from services.nlp_pool import NLPWorkerPool, NLPBusyError
 
-def parse_user_query(query: str):
+BUSY_ERROR = "NLP service is busy, please retry shortly"
+
+def _profile(include_entities):
+    # Entities need the full pipeline even when NLP_PROFILE is a lighter one
+    return "full" if include_entities else None
+
+# Parsed queries keyed on profile and normalized text. The assistant sends the
+# same few questions over and over, so most of them never reach spaCy.
+nlp_query_cache = TTLCache(NLP_CACHE_SIZE, NLP_CACHE_TTL)
+
+# A saved cache is only reused if the keyword lists, profile and models are unchanged
+NLP_CACHE_VERSION = parse_fingerprint()
+
+if NLP_CACHE_PATH:
+    nlp_query_cache.load(NLP_CACHE_PATH, NLP_CACHE_VERSION)
+
+_APOSTROPHES = re.compile(r"['\u2019]")
+# Punctuation other than hyphens inside words ("gluten-free")
+_PUNCTUATION = re.compile(r"[^\w\s-]|(?<!\w)-|-(?!\w)")
+
+def normalize_query(query: str):
+    """Canonical cache key: lowercase, no punctuation, collapsed whitespace (the parser sees the original)"""
+    return " ".join(_PUNCTUATION.sub(" ", _APOSTROPHES.sub("", query.lower())).split())
+
+def _cache_key(text, profile):
+    return f"{profile or NLP_PROFILE}:{text}"
+
+# With NLP_WORKERS set, parsing runs in worker processes and the server process never loads a model
+nlp_pool = NLPWorkerPool(
+    NLP_WORKERS,
+    max_pending=NLP_MAX_PENDING_BATCHES,
+    batch_size=NLP_BATCH_SIZE,
+    submit_timeout=NLP_SUBMIT_TIMEOUT
+) if NLP_WORKERS > 0 else None
+
+def _analyze_batch(items):
+    """Analyze (query, profile) items in a worker process, or here when there are no workers"""
+    if nlp_pool is not None:
+        return nlp_pool.submit(items)
+    return analyze_batch(items, NLP_BATCH_SIZE)
+
+# Concurrent /nlp/parse and /nlp/suggestions queries are parsed together with nlp.pipe
+nlp_batcher = MicroBatcher(
+    _analyze_batch,
+    window=NLP_BATCH_WINDOW_MS / 1000,
+    max_batch=NLP_BATCH_SIZE,
+    name="nlp-batcher",
+    max_queue=NLP_QUEUE_SIZE
+)
+
+def close_nlp():
+    """Finish queued queries, stop the worker processes and persist the query cache"""
+    nlp_batcher.close()
+    if nlp_pool is not None:
+        nlp_pool.close()
+    if NLP_CACHE_PATH:
+        nlp_query_cache.save(NLP_CACHE_PATH, NLP_CACHE_VERSION)
+
+async def _analyze(query, include_entities=False):
+    """analyze_dietary_preferences through the cache and micro-batcher, without blocking the event loop"""
+    profile = _profile(include_entities)
+    key = _cache_key(normalize_query(query), profile)
+    result = nlp_query_cache.get(key)
+    if result is None:
+        result = await asyncio.wrap_future(nlp_batcher.submit((query, profile)))
+        nlp_query_cache.set(key, result)
+    return result
+
+async def parse_user_query(query: str, include_entities: bool = False):
     """
     Parse user query to extract allergies, tastes, and dietary preferences
     
     Args:
         query: User input string
+        include_entities: Run the full pipeline so named entities are filled in
         
     Returns:
         Dictionary containing parsed information
@@ -14,12 +94,14 @@ def parse_user_query(query: str):
         return {"error": "Query is required"}
     
     try:
-        result = nlp_engine.analyze_dietary_preferences(query)
+        result = await _analyze(query, include_entities)
         return result
+    except (queue.Full, NLPBusyError):
+        return {"error": BUSY_ERROR}
     except Exception as e:
         return {"error": f"NLP processing failed: {str(e)}"}
 
-def get_smart_suggestions(query: str):
+async def get_smart_suggestions(query: str):
     """
     Get smart ingredient suggestions based on user query
     
@@ -34,12 +116,10 @@ def get_smart_suggestions(query: str):
     
     try:
         # Parse the query
-        parsed = nlp_engine.analyze_dietary_preferences(query)
+        parsed = await _analyze(query)
         
         # Get suggestions
-        suggestions = nlp_engine.get_ingredient_suggestions(
-            query, parsed['allergies'], parsed['tastes']
-        )
+        suggestions = suggest_ingredients(parsed['allergies'], parsed['tastes'])
         
         return {
             "query": query,
@@ -49,9 +129,64 @@ def get_smart_suggestions(query: str):
             "taste_count": len(parsed['tastes']),
             "dietary_preferences": parsed['dietary_preferences']
         }
+    except (queue.Full, NLPBusyError):
+        return {"error": BUSY_ERROR}
     except Exception as e:
         return {"error": f"Smart suggestions failed: {str(e)}"}
 
+def _analyze_many(queries, profile):
+    """Cached results where there are any; each distinct miss is parsed once, from its first query"""
+    keys, text_by_key = [], {}
+    for query in queries:
+        keys.append(_cache_key(normalize_query(query), profile))
+        text_by_key.setdefault(keys[-1], query)
+    found = {key: nlp_query_cache.get(key) for key in text_by_key}
+    misses = [key for key, result in found.items() if result is None]
+    texts = [text_by_key[key] for key in misses]
+    
+    if nlp_pool is None:
+        parsed = get_nlp_engine(profile).analyze_dietary_preferences_batch(texts, NLP_BATCH_SIZE)
+    else:
+        # Submitting waits for a free slot, so a large request cannot flood the workers
+        futures = [
+            nlp_pool.submit([(text, profile) for text in texts[start:start + NLP_BATCH_SIZE]])
+            for start in range(0, len(texts), NLP_BATCH_SIZE)
+        ]
+        parsed = [result for future in futures for result in future.result()]
+    
+    for key, result in zip(misses, parsed):
+        found[key] = result
+        nlp_query_cache.set(key, result)
+    return [found[key] for key in keys]
+
+def parse_user_queries_batch(queries: list, include_entities: bool = False):
+    """
+    Parse many queries in one call (e.g. review mining)
+    
+    Queries are streamed through nlp.pipe in batches of NLP_BATCH_SIZE,
+    spread over the NLP workers when there are any. Blank queries get an
+    error entry instead of failing the whole batch.
+    """
+    if not queries:
+        return {"error": "Queries list is required"}
+    
+    valid = [i for i, query in enumerate(queries) if isinstance(query, str) and query.strip()]
+    results = [{"query": query, "error": "Query is required"} for query in queries]
+    try:
+        parsed = _analyze_many([queries[i] for i in valid], _profile(include_entities))
+    except NLPBusyError:
+        return {"error": BUSY_ERROR}
+    except Exception as e:
+        return {"error": f"NLP processing failed: {str(e)}"}
+    for i, result in zip(valid, parsed):
+        results[i] = {"query": queries[i], **result}
+    
+    return {
+        "results": results,
+        "count": len(results),
+        "errors": len(results) - len(valid)
+    }
+
 def analyze_ingredients_for_allergies(ingredients: list, user_allergies: list):
     """
     Analyze a list of ingredients for potential allergens
@@ -67,36 +202,6 @@ def analyze_ingredients_for_allergies(ingredients: list, user_allergies: list):
         return {"error": "Ingredients list is required"}
     
     try:
-        # Basic ingredient allergen database
-        allergen_db = {
-            'milk': ['dairy', 'lactose'],
-            'cheese': ['dairy', 'lactose'],
-            'butter': ['dairy', 'lactose'],
-            'cream': ['dairy', 'lactose'],
-            'yogurt': ['dairy', 'lactose'],
-            'almond': ['nuts'],
-            'walnut': ['nuts'],
-            'cashew': ['nuts'],
-            'pecan': ['nuts'],
-            'hazelnut': ['nuts'],
-            'peanut': ['nuts'],
-            'wheat': ['gluten'],
-            'flour': ['gluten'],
-            'bread': ['gluten'],
-            'pasta': ['gluten'],
-            'egg': ['egg'],
-            'eggs': ['egg'],
-            'soy': ['soy'],
-            'tofu': ['soy'],
-            'soybean': ['soy'],
-            'fish': ['fish'],
-            'salmon': ['fish'],
-            'tuna': ['fish'],
-            'shrimp': ['shellfish'],
-            'crab': ['shellfish'],
-            'lobster': ['shellfish']
-        }
-        
         user_allergies_lower = [allergy.lower() for allergy in user_allergies]
         
         analysis = {
@@ -107,7 +212,7 @@ def analyze_ingredients_for_allergies(ingredients: list, user_allergies: list):
         
         for ingredient in ingredients:
             ingredient_lower = ingredient.lower()
-            ingredient_allergens = allergen_db.get(ingredient_lower, [])
+            ingredient_allergens = INGREDIENT_ALLERGENS.get(ingredient_lower, ())
             
             # Check for allergen conflicts
             conflicts = []
@@ -146,11 +251,7 @@ def get_taste_based_recommendations(taste_preferences: list, exclude_allergies:
     
     try:
         # Get suggestions using NLP engine
-        suggestions = nlp_engine.get_ingredient_suggestions(
-            "I like " + " and ".join(taste_preferences),
-            exclude_allergies or [],
-            taste_preferences
-        )
+        suggestions = suggest_ingredients(exclude_allergies or [], taste_preferences)
         
         # Categorize suggestions by taste
         categorized_suggestions = {
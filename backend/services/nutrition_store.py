@@ -0,0 +1,259 @@
+"""
+Nutrition data backends for the calorie service
+
+The built-in reference table is served from memory. Full nutrition datasets
+are ingested once into a read-only SQLite file that every worker process opens
+and memory-maps, so the rows live in the shared OS page cache instead of in
+per-worker Python dicts:
+
+    python -m services.nutrition_store nutrition.sqlite --input usda.csv
+    NUTRITION_STORE_PATH=nutrition.sqlite python run.py
+"""
+import csv
+import json
+import os
+import sqlite3
+import threading
+import numpy as np
+from services.nutrition_table import NutritionTable, NUTRIENTS
+from services.substring_index import SubstringIndex, rank_matches, query_substrings
+
+DEFAULT_UNIT = "kcal per 100g"
+
+class InMemoryNutritionStore:
+    """Serves a {name: {"calories": ..., "unit": ...}} mapping held in memory"""
+
+    def __init__(self, table):
+        self._table = table
+        self._index = SubstringIndex(table)
+        self._columns = NutritionTable.from_mapping(table)
+
+    def __len__(self):
+        return len(self._table)
+
+    def lookup(self, ingredient):
+        """
+        Resolve a normalized ingredient name to a stored key
+
+        Returns (key, source) where source is "local_database" or "partial_match",
+        or (None, None) if nothing matches.
+        """
+        if not ingredient:
+            return None, None
+        if ingredient in self._table:
+            return ingredient, "local_database"
+        matches = self._index.search(ingredient, limit=1)
+        if matches:
+            return matches[0][0], "partial_match"
+        return None, None
+
+    def record(self, key):
+        """Nutrient row for a stored key, in the get_calorie_data shape"""
+        return dict(self._table[key])
+
+    def table(self, keys):
+        """Columnar NutritionTable containing at least `keys`"""
+        return self._columns
+
+    def sample_names(self, limit):
+        return list(self._table)[:limit]
+
+class SqliteNutritionStore:
+    """
+    Read-only nutrition store backed by a SQLite file built with build_store()
+
+    Each thread gets its own connection. The file is opened immutable and
+    memory-mapped, so it is shared read-only across worker processes.
+    """
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Nutrition store not found: {path}")
+        self.path = path
+        self._local = threading.local()
+
+        meta = dict(self._connection().execute("SELECT key, value FROM meta"))
+        self._max_name_length = int(meta.get("max_name_length", 0))
+        self._has_fts = meta.get("fts") == "trigram"
+        self._count = int(meta.get("rows", 0))
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro&immutable=1", uri=True)
+            conn.execute("PRAGMA mmap_size = 1073741824")
+            self._local.conn = conn
+        return conn
+
+    def __len__(self):
+        return self._count
+
+    def lookup(self, ingredient):
+        """Same contract as InMemoryNutritionStore.lookup"""
+        if not ingredient:
+            return None, None
+        conn = self._connection()
+        if conn.execute("SELECT 1 FROM foods WHERE name = ?", (ingredient,)).fetchone():
+            return ingredient, "local_database"
+
+        candidates = self._names_inside(conn, ingredient) + self._names_containing(conn, ingredient)
+        matches = rank_matches(ingredient, candidates, limit=1)
+        if matches:
+            return matches[0][0], "partial_match"
+        return None, None
+
+    def _names_inside(self, conn, query):
+        """Stored names that occur inside the query, via the unique name index"""
+        subs = list(query_substrings(query, self._max_name_length))
+        rows = []
+        for start in range(0, len(subs), 500):
+            chunk = subs[start:start + 500]
+            rows += conn.execute(
+                f"SELECT id, name FROM foods WHERE name IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+        return rows
+
+    def _names_containing(self, conn, query):
+        """Stored names that contain the query, via the trigram full-text index"""
+        if len(query) > self._max_name_length:
+            return []
+        if self._has_fts and len(query) >= 3:
+            return conn.execute(
+                "SELECT rowid, name FROM foods_fts WHERE foods_fts MATCH ?",
+                ('"' + query.replace('"', '""') + '"',)
+            ).fetchall()
+        pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        return conn.execute("SELECT id, name FROM foods WHERE name LIKE ? ESCAPE '\\'", (pattern,)).fetchall()
+
+    def record(self, key):
+        row = self._connection().execute(
+            "SELECT calories, unit, protein, carbs, fat FROM foods WHERE name = ?", (key,)
+        ).fetchone()
+        return {"calories": row[0], "unit": row[1], "protein": row[2], "carbs": row[3], "fat": row[4]}
+
+    def table(self, keys):
+        """Gather just the requested rows into a small columnar NutritionTable"""
+        keys = list(dict.fromkeys(keys))
+        conn = self._connection()
+        rows = {}
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            for row in conn.execute(
+                f"SELECT name, calories, protein, carbs, fat, unit FROM foods WHERE name IN ({','.join('?' * len(chunk))})",
+                chunk
+            ):
+                rows[row[0]] = row
+        names = [key for key in keys if key in rows]
+        values = np.array([rows[name][1:5] for name in names], dtype=np.float64).reshape(len(names), len(NUTRIENTS))
+        return NutritionTable(names, values, [rows[name][5] for name in names])
+
+    def sample_names(self, limit):
+        return [row[0] for row in self._connection().execute("SELECT name FROM foods ORDER BY id LIMIT ?", (limit,))]
+
+def open_nutrition_store(path, fallback_table):
+    """Open the SQLite store at `path`, or serve `fallback_table` from memory"""
+    if path:
+        try:
+            return SqliteNutritionStore(path)
+        except Exception as e:
+            print(f"Error opening nutrition store {path}: {e} - using the built-in table")
+    return InMemoryNutritionStore(fallback_table)
+
+def _read_rows(input_path):
+    """Yield (name, calories, protein, carbs, fat, unit) from a CSV or JSONL file"""
+    def normalize(record):
+        name = record.get("name") or record.get("ingredient") or record.get("description")
+        if not name or record.get("calories") in (None, ""):
+            return None
+        return (
+            " ".join(str(name).lower().split()),
+            float(record["calories"]),
+            float(record.get("protein") or 0),
+            float(record.get("carbs") or 0),
+            float(record.get("fat") or 0),
+            record.get("unit") or DEFAULT_UNIT,
+        )
+
+    with open(input_path, newline="", encoding="utf-8") as f:
+        if input_path.endswith((".jsonl", ".ndjson")):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = csv.DictReader(f)
+        for record in records:
+            row = normalize(record)
+            if row is not None:
+                yield row
+
+def build_store(output_path, rows):
+    """
+    Write rows into a new SQLite store and atomically swap it into place
+
+    Duplicate names keep their first row. Workers that already have the old
+    file open keep reading it until they reopen.
+    """
+    tmp_path = f"{output_path}.tmp-{os.getpid()}"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript("""
+            PRAGMA journal_mode = OFF;
+            PRAGMA synchronous = OFF;
+            CREATE TABLE foods (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE,
+                calories REAL NOT NULL,
+                protein REAL NOT NULL,
+                carbs REAL NOT NULL,
+                fat REAL NOT NULL,
+                unit TEXT NOT NULL
+            );
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        conn.executemany(
+            "INSERT OR IGNORE INTO foods (name, calories, protein, carbs, fat, unit) VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+
+        fts = "none"
+        try:
+            conn.execute("CREATE VIRTUAL TABLE foods_fts USING fts5(name, content='foods', content_rowid='id', tokenize='trigram')")
+            conn.execute("INSERT INTO foods_fts (rowid, name) SELECT id, name FROM foods")
+            fts = "trigram"
+        except sqlite3.OperationalError as e:
+            print(f"FTS5 trigram index unavailable ({e}); partial matches will use LIKE scans")
+
+        count, max_length = conn.execute("SELECT COUNT(*), COALESCE(MAX(LENGTH(name)), 0) FROM foods").fetchone()
+        conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+            ("rows", str(count)), ("max_name_length", str(max_length)), ("fts", fts)
+        ])
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, output_path)
+    return count
+
+# Ingest a nutrition dataset
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a read-only SQLite nutrition store")
+    parser.add_argument("output", help="path of the .sqlite file to write")
+    parser.add_argument("--input", help="CSV or JSONL with name, calories, protein, carbs, fat, unit "
+                                        "(defaults to the built-in reference table)")
+    args = parser.parse_args()
+
+    if args.input:
+        rows = _read_rows(args.input)
+    else:
+        from app.reference_data import CALORIE_DATABASE
+        rows = (
+            (name, entry["calories"], entry["protein"], entry["carbs"], entry["fat"], entry["unit"])
+            for name, entry in CALORIE_DATABASE.items()
+        )
+
+    count = build_store(args.output, rows)
+    print(f"Nutrition store written to {args.output}: {count} ingredients")
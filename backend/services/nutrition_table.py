@@ -0,0 +1,59 @@
+import numpy as np
+
+# Column order of NutritionTable.values
+NUTRIENTS = ("calories", "protein", "carbs", "fat")
+
+class NutritionTable:
+    """
+    Columnar nutrient table: one row per ingredient id, one column per nutrient
+
+    Values are per 100g/100ml, so a recipe's totals are a single gather of the
+    ingredient rows followed by a dot product with amount / 100.
+    """
+
+    def __init__(self, names, values, units):
+        self.names = list(names)
+        self.values = np.asarray(values, dtype=np.float64).reshape(len(self.names), len(NUTRIENTS))
+        self.units = list(units)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def from_mapping(cls, table):
+        """Build from a {name: {"calories": ..., "protein": ..., "unit": ...}} mapping"""
+        names = list(table)
+        values = [[table[name].get(nutrient, 0) for nutrient in NUTRIENTS] for name in names]
+        units = [table[name].get("unit", "kcal per 100g") for name in names]
+        return cls(names, values, units)
+
+    def __len__(self):
+        return len(self.names)
+
+    def totals(self, ids, amounts):
+        """
+        Nutrients for a single recipe
+
+        Returns (per_item, totals): an (n_items, 4) matrix and the 4 summed columns.
+        """
+        multipliers = np.asarray(amounts, dtype=np.float64) / 100
+        rows = self.values[np.asarray(ids, dtype=np.intp)]
+        return rows * multipliers[:, None], multipliers @ rows
+
+    def score_recipes(self, recipe_ids, recipe_amounts):
+        """
+        Nutrient totals for many recipes at once
+
+        recipe_ids / recipe_amounts are parallel lists of per-recipe id and amount
+        lists. Amounts are scattered into a sparse (recipes x ingredients) matrix
+        that is multiplied by the nutrient columns in one operation.
+        """
+        from scipy import sparse
+
+        lengths = [len(ids) for ids in recipe_ids]
+        if not lengths or sum(lengths) == 0:
+            return np.zeros((len(lengths), len(NUTRIENTS)))
+
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        cols = np.concatenate([np.asarray(ids, dtype=np.intp) for ids in recipe_ids])
+        data = np.concatenate([np.asarray(amounts, dtype=np.float64) for amounts in recipe_amounts]) / 100
+        weights = sparse.csr_matrix((data, (rows, cols)), shape=(len(lengths), len(self.names)))
+        return weights @ self.values
@@ -0,0 +1,161 @@
+import numpy as np
+
+# Edge weights by source; an edge found in several sources keeps the strongest
+DIRECT_PAIRING_WEIGHT = 1.0
+CATEGORY_PAIRING_WEIGHT = 0.5
+
+class PairingGraph:
+    """
+    Undirected ingredient pairing graph in CSR form
+
+    Adjacency is held as the three compact CSR arrays (indptr, indices,
+    weights), so expansion and complement queries are sparse matrix-vector
+    products over the whole graph rather than Python loops over neighbours.
+    """
+
+    def __init__(self, names, indptr, indices, weights):
+        self.names = list(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.indptr = np.asarray(indptr, dtype=np.int32)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self._matrix = None
+        self._links = None
+
+    @classmethod
+    def from_edges(cls, edges):
+        """Build from (a, b, weight) edges; names are lowercased and self-loops dropped"""
+        strongest = {}
+        for a, b, weight in edges:
+            a, b = a.lower().strip(), b.lower().strip()
+            if a == b:
+                continue
+            for edge in ((a, b), (b, a)):
+                strongest[edge] = max(strongest.get(edge, 0.0), weight)
+
+        names = sorted({name for edge in strongest for name in edge})
+        ids = {name: i for i, name in enumerate(names)}
+        edge_list = sorted((ids[a], ids[b], weight) for (a, b), weight in strongest.items())
+        rows = np.array([row for row, _, _ in edge_list], dtype=np.int64)
+        indptr = np.searchsorted(rows, np.arange(len(names) + 1))
+        return cls(names, indptr, [col for _, col, _ in edge_list], [weight for _, _, weight in edge_list])
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def edge_count(self):
+        return len(self.indices) // 2
+
+    @property
+    def matrix(self):
+        if self._matrix is None:
+            from scipy import sparse
+            n = len(self.names)
+            self._matrix = sparse.csr_matrix((self.weights, self.indices, self.indptr), shape=(n, n))
+        return self._matrix
+
+    @property
+    def links(self):
+        """Unweighted adjacency, for counting connections"""
+        if self._links is None:
+            links = self.matrix.copy()
+            links.data[:] = 1.0
+            self._links = links
+        return self._links
+
+    def resolve(self, ingredients):
+        """Node ids of the known ingredients, plus the names that are not in the graph"""
+        ids, unmatched = [], []
+        for ingredient in ingredients:
+            name = ingredient.lower().strip() if isinstance(ingredient, str) else None
+            if name in self.ids:
+                ids.append(self.ids[name])
+            else:
+                unmatched.append(ingredient)
+        return list(dict.fromkeys(ids)), unmatched
+
+    def expand(self, seeds, hops=2, limit=20):
+        """
+        Ingredients reachable from the seed ids within `hops` steps
+
+        Each hop is one product of the adjacency matrix with the previous
+        frontier's scores, so a node's score sums the weights of the paths
+        reaching it. Returns (name, hop, score) nearest hop first, best score
+        first within a hop.
+        """
+        n = len(self.names)
+        reached = np.zeros(n, dtype=bool)
+        reached[seeds] = True
+        frontier = np.zeros(n, dtype=np.float32)
+        frontier[seeds] = 1.0
+
+        found = []
+        for hop in range(1, hops + 1):
+            scores = self.matrix @ frontier
+            new = (scores > 0) & ~reached
+            if not new.any():
+                break
+            ids = np.flatnonzero(new)
+            ids = ids[np.lexsort((ids, -scores[ids]))]
+            found.extend((self.names[i], hop, round(float(scores[i]), 4)) for i in ids)
+            if len(found) >= limit:
+                break
+            reached |= new
+            frontier = np.where(new, scores, 0).astype(np.float32)
+        return found[:limit]
+
+    def complements(self, seeds, limit=10):
+        """
+        Ingredients that pair best with the whole seed set
+
+        Score is the total edge weight to the set; ties go to the ingredient
+        connected to more of the set. Returns (name, score, connections).
+        """
+        indicator = np.zeros(len(self.names), dtype=np.float32)
+        indicator[seeds] = 1.0
+        scores = self.matrix @ indicator
+        connections = self.links @ indicator
+        scores[seeds] = 0
+
+        candidates = np.flatnonzero(scores > 0)
+        candidates = candidates[np.lexsort((candidates, -connections[candidates], -scores[candidates]))]
+        return [(self.names[i], round(float(scores[i]), 4), int(connections[i])) for i in candidates[:limit]]
+
+def build_pairing_graph(local_db, flavor_database, categories):
+    """
+    One graph from every pairing source
+
+    - pairings in LOCAL_FLAVOR_DB and pairing_suggestions in ml/flavor_database.py
+      are direct ingredient pairings;
+    - a category's pairings connect each of its ingredients to the ingredients
+      of a paired category, or to the paired term itself when it names a known
+      ingredient. Abstract terms ("acidic", "herbs") never become nodes, even
+      where a direct pairing list mentions them.
+    """
+    edges = []
+    for name, entry in local_db.items():
+        edges += [(name, other, DIRECT_PAIRING_WEIGHT) for other in entry.get("pairings", ())]
+    for name, entry in flavor_database.items():
+        edges += [(name, other, DIRECT_PAIRING_WEIGHT) for other in entry.get("pairing_suggestions", ())]
+
+    # Ingredients with records of their own or listed under a category
+    known = {name.lower().strip() for name in (*local_db, *flavor_database)}
+    known.update(ingredient.lower().strip() for data in categories.values() for ingredient in data["ingredients"])
+    # Category pairing terms that are neither categories nor ingredients, wherever they appear
+    abstract = {
+        paired.lower().strip() for data in categories.values() for paired in data["pairings"]
+        if paired not in categories and paired.lower().strip() not in known
+    }
+    edges = [edge for edge in edges if edge[1].lower().strip() not in abstract]
+
+    for data in categories.values():
+        for paired in data["pairings"]:
+            targets = list(categories[paired]["ingredients"]) if paired in categories else []
+            if paired.lower().strip() in known:
+                targets.append(paired)
+            edges += [
+                (ingredient, target, CATEGORY_PAIRING_WEIGHT)
+                for ingredient in data["ingredients"] for target in targets
+            ]
+    return PairingGraph.from_edges(edges)
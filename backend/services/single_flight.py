@@ -0,0 +1,57 @@
+import asyncio
+
+# Upper bounds of the "callers per flight" histogram buckets; the last is open-ended
+FLIGHT_SIZE_BUCKETS = (1, 2, 5, 10, 50)
+
+class SingleFlight:
+    """
+    Coalesces concurrent async calls for the same key into one execution
+
+    The first caller for a key starts the work; callers that arrive while it
+    is running await the same result instead of repeating it. The work runs
+    as its own task, so a caller that disconnects does not cancel it for the
+    others.
+    """
+
+    def __init__(self):
+        self._flights = {}
+        self._flights_started = 0
+        self._calls = 0
+        self._max_callers = 0
+        self._histogram = [0] * (len(FLIGHT_SIZE_BUCKETS) + 1)
+
+    async def do(self, key, fn):
+        """Return the result of `await fn()`, shared with concurrent calls for key"""
+        self._calls += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(fn())
+            flight = self._flights[key] = {"task": task, "callers": 1}
+            self._flights_started += 1
+            task.add_done_callback(lambda _, key=key, flight=flight: self._finish(key, flight))
+        else:
+            flight["callers"] += 1
+        return await asyncio.shield(flight["task"])
+
+    def _finish(self, key, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        callers = flight["callers"]
+        self._max_callers = max(self._max_callers, callers)
+        for i, bound in enumerate(FLIGHT_SIZE_BUCKETS):
+            if callers <= bound:
+                self._histogram[i] += 1
+                break
+        else:
+            self._histogram[-1] += 1
+
+    def stats(self):
+        labels = [f"<={bound}" for bound in FLIGHT_SIZE_BUCKETS] + [f">{FLIGHT_SIZE_BUCKETS[-1]}"]
+        return {
+            "flights": self._flights_started,
+            "calls": self._calls,
+            "collapsed": self._calls - self._flights_started,
+            "in_flight": len(self._flights),
+            "max_callers_per_flight": self._max_callers,
+            "callers_per_flight": dict(zip(labels, self._histogram)),
+        }
@@ -1,10 +1,37 @@
+from app.config import SUBSTITUTION_CACHE_SIZE, SUBSTITUTION_CACHE_TTL
+from app.reference_data import FALLBACK_SUBSTITUTIONS
+from ml.simple_model import predict_substitutes_batch as simple_predict_batch
+from services.cache import TTLCache
+
 try:
-    from ml.ml_engine import predict_substitute
+    from ml.ml_engine import predict_substitutes_batch, model_registry, SKLEARN_AVAILABLE
     ML_ENGINE_AVAILABLE = True
 except ImportError as e:
     print(f"ML engine not available: {e}")
     ML_ENGINE_AVAILABLE = False
 
+# Resolved substitutions keyed on the model version and the normalized
+# ingredient name. Traffic is dominated by a few dozen staples, so most
+# requests never reach a model.
+substitution_cache = TTLCache(SUBSTITUTION_CACHE_SIZE, SUBSTITUTION_CACHE_TTL)
+
+if ML_ENGINE_AVAILABLE:
+    model_registry.add_reload_listener(lambda _: substitution_cache.clear())
+
+def _model_version():
+    """Which ML model answered, so simple-model and fallback answers never outlive its arrival"""
+    if ML_ENGINE_AVAILABLE and SKLEARN_AVAILABLE:
+        return model_registry.version()
+    return None
+
+def normalize_ingredient(ingredient: str):
+    """Canonical cache key: lowercase with collapsed whitespace"""
+    return " ".join(ingredient.lower().split())
+
+def _has_error(result):
+    """Model results are lists on success and {"error": ...} dicts on failure"""
+    return result is None or (isinstance(result, dict) and bool(result.get("error")))
+
 def get_substitution(ingredient: str):
     """
     Get ingredient substitutions using ML model or fallback data
@@ -12,84 +39,88 @@ def get_substitution(ingredient: str):
     if not ingredient:
         return {"error": "Ingredient name is required"}
     
+    return _resolve_substitutions([ingredient])[0]
+
+def get_substitutions_batch(ingredients: list):
+    """
+    Get substitutions for many ingredients in one call
+    
+    Each model scores all of its unresolved ingredients with a single matrix
+    product. Items come back in input order, either with "substitutes" in the
+    shape get_substitution returns or with a per-item "error".
+    """
+    if not ingredients:
+        return {"error": "Ingredients list is required"}
+    
+    results = []
+    errors = 0
+    for ingredient, result in zip(ingredients, _resolve_substitutions(ingredients)):
+        if _has_error(result):
+            errors += 1
+            results.append({"ingredient": ingredient, "error": result["error"]})
+        else:
+            results.append({"ingredient": ingredient, "substitutes": result})
+    
+    return {"results": results, "count": len(results), "errors": errors}
+
+def _resolve_substitutions(ingredients):
+    """Answer from the curated table, then run the ML engine and simple model over every unresolved ingredient"""
+    results = [None] * len(ingredients)
+    keys = [None] * len(ingredients)
+    version = _model_version()
+    for pos, ingredient in enumerate(ingredients):
+        if not ingredient or not isinstance(ingredient, str) or not ingredient.strip():
+            results[pos] = {"error": "Ingredient name is required"}
+            continue
+        keys[pos] = normalize_ingredient(ingredient)
+        # Curated substitutions take precedence over model neighbours
+        results[pos] = get_fallback_substitutions(keys[pos]) or substitution_cache.get((version, keys[pos]))
+    
+    misses = [pos for pos, result in enumerate(results) if result is None]
+    
     # Try ML engine first
-    if ML_ENGINE_AVAILABLE:
+    pending = misses
+    degraded = False
+    if ML_ENGINE_AVAILABLE and pending:
         try:
-            result = predict_substitute(ingredient)
-            if not result.get("error"):
-                return result
+            predictions = predict_substitutes_batch([keys[pos] for pos in pending])
+            for pos, result in zip(pending, predictions):
+                if not _has_error(result):
+                    results[pos] = result
+                elif result["error"].startswith("Prediction failed"):
+                    degraded = True
         except Exception as e:
+            degraded = True
             print(f"ML engine failed: {e}")
     
     # Try simple ML model
-    try:
-        from ml.simple_model import predict_substitute as simple_predict
-        result = simple_predict(ingredient)
-        if not result.get("error"):
-            return result
-    except Exception as e:
-        print(f"Simple model failed: {e}")
+    pending = [pos for pos, result in enumerate(results) if result is None]
+    if pending:
+        try:
+            predictions = simple_predict_batch([keys[pos] for pos in pending])
+            for pos, result in zip(pending, predictions):
+                if not _has_error(result):
+                    results[pos] = result
+        except Exception as e:
+            print(f"Simple model failed: {e}")
     
-    # Fallback to predefined substitutions
-    fallback_substitutions = get_fallback_substitutions(ingredient.lower())
-    if fallback_substitutions:
-        return fallback_substitutions
+    for pos in misses:
+        if results[pos] is None:
+            results[pos] = {"error": f"No substitutes found for '{keys[pos]}'. Try specific ingredients like 'milk', 'butter', or 'cheese'."}
     
-    return {"error": f"No substitutes found for '{ingredient}'. Try specific ingredients like 'milk', 'butter', or 'cheese'."}
+    # Errors, and answers given because an engine call failed, are not cached
+    # so they are retried instead of being pinned for the whole TTL. Answers
+    # given while no ML model is loaded are cached under that version and
+    # cleared by the reload listener once one loads.
+    if not degraded:
+        for pos in misses:
+            if not _has_error(results[pos]):
+                substitution_cache.set((version, keys[pos]), results[pos])
+    
+    return results
 
 def get_fallback_substitutions(ingredient: str):
     """
     Fallback substitution database for common ingredients with ML-like scores
     """
-    substitutions = {
-        "milk": [
-            {"ingredient": "almond milk", "score": 90},
-            {"ingredient": "soy milk", "score": 85},
-            {"ingredient": "coconut milk", "score": 80},
-            {"ingredient": "oat milk", "score": 82},
-            {"ingredient": "cashew milk", "score": 83}
-        ],
-        "butter": [
-            {"ingredient": "coconut oil", "score": 88},
-            {"ingredient": "olive oil", "score": 75},
-            {"ingredient": "margarine", "score": 92},
-            {"ingredient": "ghee", "score": 85},
-            {"ingredient": "avocado oil", "score": 80}
-        ],
-        "cheese": [
-            {"ingredient": "nutritional yeast", "score": 78},
-            {"ingredient": "cashew cheese", "score": 85},
-            {"ingredient": "tofu", "score": 70},
-            {"ingredient": "mozzarella", "score": 88}
-        ],
-        "eggs": [
-            {"ingredient": "flax eggs", "score": 82},
-            {"ingredient": "chia eggs", "score": 82},
-            {"ingredient": "applesauce", "score": 75},
-            {"ingredient": "banana", "score": 70},
-            {"ingredient": "silken tofu", "score": 78}
-        ],
-        "flour": [
-            {"ingredient": "almond flour", "score": 88},
-            {"ingredient": "coconut flour", "score": 80},
-            {"ingredient": "oat flour", "score": 85},
-            {"ingredient": "whole wheat flour", "score": 90},
-            {"ingredient": "gluten-free flour", "score": 82}
-        ],
-        "sugar": [
-            {"ingredient": "honey", "score": 88},
-            {"ingredient": "maple syrup", "score": 85},
-            {"ingredient": "stevia", "score": 75},
-            {"ingredient": "coconut sugar", "score": 82},
-            {"ingredient": "brown sugar", "score": 90}
-        ],
-        "dairy": [
-            {"ingredient": "almond milk", "score": 90},
-            {"ingredient": "coconut yogurt", "score": 85},
-            {"ingredient": "nutritional yeast", "score": 78},
-            {"ingredient": "dairy-free", "score": 88},
-            {"ingredient": "plant-based milk", "score": 86}
-        ]
-    }
-    
-    return substitutions.get(ingredient, None)
+    return FALLBACK_SUBSTITUTIONS.get(ingredient, None)
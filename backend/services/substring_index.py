@@ -0,0 +1,153 @@
+import heapq
+import itertools
+import re
+from array import array
+
+GRAM_SIZE = 3
+# Longest prefix of a query whose substrings are looked up as keys
+MAX_QUERY_LENGTH = 256
+
+def _grams(text):
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+def _short_words(text):
+    """Words too short to have a trigram, plus the singular of short plurals ("ox" for "oxs")"""
+    words = set()
+    for word in re.findall(r"[^\W_]+", text):
+        if len(word) < GRAM_SIZE:
+            words.add(word)
+        if word.endswith("s") and 1 < len(word) <= GRAM_SIZE:
+            words.add(word[:-1])
+    return words
+
+def _is_word_boundary(text, start, end):
+    """True if text[start:end] is a whole word (allowing a plural "s") within text"""
+    if start > 0 and text[start - 1].isalnum():
+        return False
+    if end < len(text) and text[end] == "s":
+        end += 1
+    return end == len(text) or not text[end].isalnum()
+
+def match_score(query, key):
+    """
+    Score how well key matches query when one contains the other
+
+    Coverage of the longer string by the shorter one, plus a bonus when the
+    match is a whole word. Returns -1.0 if neither contains the other.
+    """
+    best = -1.0
+    n = len(query)
+
+    # Key inside the query; keep the best of all occurrences
+    start = query.find(key)
+    while start >= 0:
+        end = start + len(key)
+        best = max(best, len(key) / n + (0.5 if _is_word_boundary(query, start, end) else 0.0))
+        start = query.find(key, start + 1)
+
+    # Query inside the key
+    start = key.find(query)
+    if start >= 0:
+        best = max(best, n / len(key) + (0.5 if _is_word_boundary(key, start, start + n) else 0.0))
+
+    return best
+
+def rank_matches(query, candidates, limit=5):
+    """
+    Rank (order, key) candidates for query, best first, ties by order
+
+    Returns up to `limit` (key, score) pairs.
+    """
+    scored = {}
+    for order, key in candidates:
+        if order not in scored:
+            scored[order] = (match_score(query, key), key)
+    ranked = heapq.nsmallest(limit, scored.items(), key=lambda item: (-item[1][0], item[0]))
+    return [(key, round(score, 4)) for _, (score, key) in ranked if score >= 0]
+
+def query_substrings(query, max_length):
+    """
+    Every distinct substring of query no longer than max_length
+
+    Only the first MAX_QUERY_LENGTH characters are searched, so a huge query
+    costs at most MAX_QUERY_LENGTH * max_length substrings.
+    """
+    query = query[:MAX_QUERY_LENGTH]
+    n = len(query)
+    return {query[start:end] for start in range(n) for end in range(start + 1, min(n, start + max_length) + 1)}
+
+class SubstringIndex:
+    """
+    Finds keys that contain a query, or are contained in it, without scanning every key
+
+    - Keys inside the query are found by probing the hash of every substring of
+      the query, so the cost depends on the query length, not the table size.
+    - Keys containing the query are found through a trigram inverted index:
+      only keys that share the query's rarest trigram are verified. Queries
+      shorter than a trigram only find keys where they are a whole word, through
+      a separate word index, since nearly every key contains a letter or two.
+
+    Postings are stored as compact uint32 arrays so the index stays small even
+    for tables with hundreds of thousands of keys.
+    """
+
+    def __init__(self, keys):
+        self.keys = list(keys)
+        self._ids = {}
+        for i, key in enumerate(self.keys):
+            self._ids.setdefault(key, i)
+        self._max_key_length = max((len(key) for key in self.keys), default=0)
+
+        postings = {}
+        for i, key in enumerate(self.keys):
+            for gram in _grams(key):
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array("I")
+                posting.append(i)
+        self._postings = postings
+
+        short_words = {}
+        for i, key in enumerate(self.keys):
+            for word in _short_words(key):
+                posting = short_words.get(word)
+                if posting is None:
+                    posting = short_words[word] = array("I")
+                posting.append(i)
+        self._short_words = short_words
+
+    def __len__(self):
+        return len(self.keys)
+
+    def search(self, query, limit=5):
+        """
+        Return up to `limit` (key, score) pairs, best match first
+
+        The score favours matches that cover more of the longer string and that
+        fall on word boundaries; ties keep table order.
+        """
+        if not query:
+            return []
+
+        # Keys contained in the query
+        inside = ((self._ids[sub], sub) for sub in query_substrings(query, self._max_key_length) if sub in self._ids)
+        # Keys containing the query
+        around = ((i, self.keys[i]) for i in self._keys_containing(query))
+
+        return rank_matches(query, itertools.chain(inside, around), limit)
+
+    def _keys_containing(self, query):
+        if len(query) > self._max_key_length:
+            return ()
+        if len(query) < GRAM_SIZE:
+            # Too short for the trigram index; a part-word match would score low anyway
+            return self._short_words.get(query, ())
+
+        rarest = None
+        for gram in _grams(query):
+            posting = self._postings.get(gram)
+            if posting is None:
+                return ()
+            if rarest is None or len(posting) < len(rarest):
+                rarest = posting
+        return (i for i in rarest if query in self.keys[i])
@@ -0,0 +1,32 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.stub_flavor_api import start_stub_server
+
+# Configuration is read when the app modules are imported, so the upstream
+# and the shared SQLite files point at the stub and a scratch directory
+# before any test module imports them
+STUB_API = start_stub_server()
+SCRATCH_DIR = tempfile.mkdtemp(prefix="flavorverse-tests-")
+os.environ["FLAVOR_API_BASE_URL"] = STUB_API.base_url
+os.environ["FLAVOR_CACHE_PATH"] = os.path.join(SCRATCH_DIR, "flavor_cache.sqlite")
+os.environ["NLP_PROFILE"] = "lexical"
+os.environ["NLP_CACHE_PATH"] = ""
+
+@pytest.fixture
+def stub_api():
+    """The stub flavor API, answering immediately and with fresh counters"""
+    STUB_API.delay = 0.0
+    STUB_API.fail = False
+    with STUB_API.lock:
+        STUB_API.counts.update(requests=0, connections=0)
+    yield STUB_API
+
+def pytest_sessionfinish(session, exitstatus):
+    STUB_API.shutdown()
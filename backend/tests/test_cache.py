@@ -0,0 +1,70 @@
+import json
+import time
+
+from services.cache import TTLCache
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = TTLCache(maxsize=10)
+    cache.set("a", {"tokens": ["a"]})
+    cache.set("b", [1, 2])
+    assert cache.save(path, version="v1") == 2
+
+    restored = TTLCache(maxsize=10)
+    assert restored.load(path, version="v1") == 2
+    assert restored.get("a") == {"tokens": ["a"]}
+    assert restored.get("b") == [1, 2]
+
+def test_load_ignores_other_version(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.save(path, version="v1")
+
+    restored = TTLCache()
+    assert restored.load(path, version="v2") == 0
+    assert restored.get("a") is None
+
+def test_load_ignores_unversioned_list_format(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text(json.dumps([["a", 1, None]]))
+
+    restored = TTLCache()
+    assert restored.load(str(path)) == 0
+    assert len(restored) == 0
+
+def test_load_missing_file(tmp_path):
+    assert TTLCache().load(str(tmp_path / "missing.json"), version="v1") == 0
+
+def test_save_keeps_lru_order_and_load_respects_maxsize(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = TTLCache(maxsize=10)
+    for key in "abc":
+        cache.set(key, key)
+    cache.get("a")
+    cache.save(path)
+
+    restored = TTLCache(maxsize=2)
+    restored.load(path)
+    assert restored.get("b") is None
+    assert restored.get("c") == "c"
+    assert restored.get("a") == "a"
+
+def test_expired_entries_are_not_saved(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = TTLCache(ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.save(path) == 0
+
+def test_loaded_entries_expire_within_current_ttl(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.save(path)
+
+    restored = TTLCache(ttl=0.01)
+    restored.load(path)
+    time.sleep(0.02)
+    assert restored.get("a") is None
+    assert restored.stats()["expirations"] == 1
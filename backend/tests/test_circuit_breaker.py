@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+import pytest
+
+from services import flavordb_service
+from services.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+def test_opens_after_threshold_failures():
+    breaker = CircuitBreaker("test", failure_threshold=5, reset_timeout=30)
+    for _ in range(4):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.is_open()
+    assert not breaker.allow()
+    assert breaker.stats()["rejected"] == 1
+    assert breaker.stats()["opened"] == 1
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker("test", failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+
+    assert not breaker.is_open()
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+def test_failed_probe_opens_again():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+def test_released_probe_can_be_retried():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+@pytest.fixture
+def flavor_breaker(monkeypatch):
+    breaker = CircuitBreaker("flavor_api", failure_threshold=5, reset_timeout=30)
+    monkeypatch.setattr(flavordb_service, "flavor_breaker", breaker)
+    return breaker
+
+def test_upstream_outage_fails_fast_after_five_failures(stub_api, flavor_breaker):
+    stub_api.fail = True
+
+    async def main():
+        return [await flavordb_service.get_all_flavors() for _ in range(8)]
+
+    results = asyncio.run(main())
+    assert all("error" in result for result in results)
+    assert stub_api.counts["requests"] == 5
+    assert flavor_breaker.state == OPEN
+    assert "temporarily unavailable" in results[-1]["error"]
+
+def test_client_errors_do_not_open_the_circuit(stub_api, flavor_breaker, monkeypatch):
+    monkeypatch.setattr(flavordb_service, "FLAVOR_API_URL", f"{stub_api.base_url}/missing")
+
+    async def main():
+        return [await flavordb_service.get_all_flavors() for _ in range(6)]
+
+    asyncio.run(main())
+    assert stub_api.counts["requests"] == 6
+    assert flavor_breaker.state == CLOSED
@@ -0,0 +1,59 @@
+import sqlite3
+import time
+
+from services import flavor_cache
+from services.flavor_cache import PersistentFlavorCache, connect, SCHEMA
+
+def test_put_and_get_entry(tmp_path):
+    cache = PersistentFlavorCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get_entry("basil") is None
+
+    cache.put("basil", {"flavors": ["herbal"]})
+    assert cache.get_entry("basil") == ({"flavors": ["herbal"]}, False)
+
+    cache.put("basil", {"flavors": ["sweet"]})
+    assert cache.get_entry("basil") == ({"flavors": ["sweet"]}, False)
+    assert cache.stats()["entries"] == 1
+
+def test_expired_entries_are_returned_stale(tmp_path):
+    cache = PersistentFlavorCache(str(tmp_path / "cache.sqlite"), ttl=-1)
+    cache.put("basil", {"flavors": ["herbal"]})
+    assert cache.get_entry("basil") == ({"flavors": ["herbal"]}, True)
+    assert cache.stats()["expired"] == 1
+
+def test_uses_wal_and_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    writer = PersistentFlavorCache(path)
+    reader = PersistentFlavorCache(path)
+    writer.put("mint", {"flavors": ["cool"]})
+
+    assert reader.get_entry("mint") == ({"flavors": ["cool"]}, False)
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+def test_evict_keeps_most_recently_used(tmp_path):
+    cache = PersistentFlavorCache(str(tmp_path / "cache.sqlite"), max_entries=2, evict_every=0)
+    for key in ("a", "b", "c"):
+        cache.put(key, key)
+        time.sleep(0.01)
+
+    assert cache.evict() == 1
+    assert cache.get_entry("a") is None
+    assert cache.get_entry("c") == ("c", False)
+
+def test_access_bump_does_not_wait_for_a_writer(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite")
+    cache = PersistentFlavorCache(path)
+    cache.put("basil", "herbal")
+    monkeypatch.setattr(flavor_cache, "ACCESS_RESOLUTION_SECONDS", -1)
+
+    other = connect(path, SCHEMA)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        start = time.perf_counter()
+        assert cache.get_entry("basil") == ("herbal", False)
+        assert time.perf_counter() - start < 1.0
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from services import flavordb_service
+from services.flavor_catalog import FlavorCatalog, encode_cursor, decode_cursor, etag_matches
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("abc123", 50)) == ("abc123", 50)
+    assert decode_cursor(None) == (None, 0)
+    assert decode_cursor("") == (None, 0)
+
+@pytest.mark.parametrize("cursor", ["!!!", encode_cursor("", 5), "cDo1MA", encode_cursor("v1", "x")])
+def test_invalid_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+def test_etag_matches():
+    assert etag_matches('"v1-0-50"', '"v1-0-50"')
+    assert etag_matches('W/"v1-0-50"', '"v1-0-50"')
+    assert etag_matches('"other", "v1-0-50"', '"v1-0-50"')
+    assert etag_matches("*", '"v1-0-50"')
+    assert not etag_matches('"v2-0-50"', '"v1-0-50"')
+    assert not etag_matches(None, '"v1-0-50"')
+
+def test_snapshot_pages(tmp_path):
+    catalog = FlavorCatalog(str(tmp_path / "catalog.sqlite"))
+    assert catalog.meta() == {}
+
+    version = catalog.replace([{"id": i} for i in range(5)])
+    meta, items, next_after = catalog.page(0, 2)
+    assert meta["version"] == version and meta["count"] == 5
+    assert [json.loads(item) for item in items] == [{"id": 0}, {"id": 1}]
+    assert next_after == 2
+
+    _, items, next_after = catalog.page(4, 2)
+    assert [json.loads(item) for item in items] == [{"id": 4}]
+    assert next_after is None
+
+    assert catalog.replace([{"id": i} for i in range(5)]) == version
+    assert catalog.replace([{"id": 9}]) != version
+
+def _get(path, **kwargs):
+    from app.main import app
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, **kwargs)
+    return asyncio.run(main())
+
+@pytest.fixture
+def catalogue(stub_api):
+    """The stub's catalogue prefetched into the local snapshot"""
+    result = asyncio.run(flavordb_service.prefetch_flavor_catalog(page_size=100))
+    assert result["count"] == 500 and result["pages"] == 6
+    return result
+
+def test_cursor_walks_the_whole_snapshot(catalogue):
+    ids = []
+    cursor = None
+    while True:
+        params = {"limit": 200, **({"cursor": cursor} if cursor else {})}
+        response = _get("/flavors", params=params)
+        assert response.status_code == 200
+        body = response.json()
+        assert body["version"] == catalogue["version"] and body["total"] == 500
+        ids += [item["id"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert ids == list(range(1, 501))
+
+def test_etag_revalidation(catalogue):
+    first = _get("/flavors", params={"limit": 10})
+    etag = first.headers["ETag"]
+    assert etag == f'"{catalogue["version"]}-0-10"'
+
+    cached = _get("/flavors", params={"limit": 10}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+
+    other_page = _get("/flavors", params={"limit": 20}, headers={"If-None-Match": etag})
+    assert other_page.status_code == 200
+
+def test_cursor_from_a_replaced_snapshot_is_refused(catalogue):
+    cursor = _get("/flavors", params={"limit": 100}).json()["next_cursor"]
+    new_version = flavordb_service.flavor_catalog.replace([{"id": 1}])
+    try:
+        body = _get("/flavors", params={"cursor": cursor}).json()
+        assert "refreshed" in body["error"]
+        assert body["version"] == new_version
+
+        assert "error" in _get("/flavors", params={"cursor": "not a cursor"}).json()
+    finally:
+        asyncio.run(flavordb_service.prefetch_flavor_catalog(page_size=100))
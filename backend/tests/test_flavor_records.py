@@ -0,0 +1,44 @@
+import pytest
+
+from ml.flavor_records import FlavorRecordFile, write_record_file
+
+RECORDS = {
+    "vanilla": {"flavors": ["sweet", "creamy"], "intensity": 0.7},
+    "basil": {"flavors": ["herbal"], "pairings": ["tomato"]},
+    "jalapeño": {"flavors": ["spicy"]},
+    "a": {},
+}
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "flavors.flvr")
+    write_record_file(path, RECORDS)
+    records = FlavorRecordFile(path)
+
+    assert len(records) == len(RECORDS)
+    assert dict(records.items()) == RECORDS
+    assert list(records) == sorted(RECORDS, key=lambda name: name.encode("utf-8"))
+    assert records["jalapeño"] == {"flavors": ["spicy"]}
+    assert "basil" in records
+    assert "bas" not in records and 42 not in records
+    with pytest.raises(KeyError):
+        records["cumin"]
+    assert records.get("cumin") is None
+
+def test_empty_file(tmp_path):
+    path = str(tmp_path / "empty.flvr")
+    write_record_file(path, {})
+    records = FlavorRecordFile(path)
+    assert len(records) == 0
+    assert "basil" not in records
+
+def test_rewrite_replaces_the_file(tmp_path):
+    path = str(tmp_path / "flavors.flvr")
+    write_record_file(path, RECORDS)
+    write_record_file(path, {"mint": {"flavors": ["cool"]}})
+    assert dict(FlavorRecordFile(path).items()) == {"mint": {"flavors": ["cool"]}}
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "not.flvr"
+    path.write_bytes(b"not a flavor record file at all, just some bytes")
+    with pytest.raises(ValueError):
+        FlavorRecordFile(str(path))
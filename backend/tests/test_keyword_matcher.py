@@ -0,0 +1,46 @@
+import re
+
+from ml.keyword_matcher import KeywordMatcher
+
+def tokenize(text):
+    return re.findall(r"\w+|[^\w\s]", text)
+
+def find(matcher, text, lemmas=None):
+    tokens = tokenize(text.lower())
+    return matcher.find(tokens, lemmas or tokens)
+
+PHRASES = {
+    ("allergies", "soy"): ["soy", "soy sauce"],
+    ("allergies", "dairy"): ["milk", "soy milk"],
+    ("tastes", "sweet"): ["sweet"],
+    ("tastes", "sweet and sour"): ["sweet and sour"],
+    ("dietary", "gluten_free"): ["gluten-free"],
+}
+
+def test_overlapping_category_reports_every_match():
+    matcher = KeywordMatcher.build(PHRASES, tokenize, overlapping=("allergies",))
+    matches = find(matcher, "soy milk please")
+    assert sorted(matches) == [
+        ("allergies", "dairy", 0, 2),
+        ("allergies", "dairy", 1, 2),
+        ("allergies", "soy", 0, 1),
+    ]
+
+def test_other_categories_keep_the_longest_match():
+    matcher = KeywordMatcher.build(PHRASES, tokenize, overlapping=("allergies",))
+    matches = find(matcher, "sweet and sour soy sauce")
+    assert [match for match in matches if match[0] == "tastes"] == [("tastes", "sweet and sour", 0, 3)]
+    assert ("allergies", "soy", 3, 5) in matches and ("allergies", "soy", 3, 4) in matches
+
+def test_without_overlapping_the_longest_match_wins():
+    matcher = KeywordMatcher.build(PHRASES, tokenize)
+    assert find(matcher, "soy milk") == [("allergies", "dairy", 0, 2)]
+
+def test_one_match_per_span_when_text_and_lemma_both_match():
+    matcher = KeywordMatcher.build({("allergies", "dairy"): ["milk", "milks"]}, tokenize, overlapping=("allergies",))
+    assert find(matcher, "milks", lemmas=["milk"]) == [("allergies", "dairy", 0, 1)]
+
+def test_hyphenated_phrases_match_their_spaced_form():
+    matcher = KeywordMatcher.build(PHRASES, tokenize)
+    assert find(matcher, "gluten-free bread") == [("dietary", "gluten_free", 0, 3)]
+    assert find(matcher, "gluten free bread") == [("dietary", "gluten_free", 0, 2)]
@@ -0,0 +1,56 @@
+import asyncio
+
+from services import flavordb_service
+from services.single_flight import SingleFlight
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"value": 42}
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", fetch) for _ in range(20)))
+
+    results = asyncio.run(main())
+    assert results == [{"value": 42}] * 20
+    assert len(calls) == 1
+    stats = flights.stats()
+    assert stats["flights"] == 1
+    assert stats["collapsed"] == 19
+    assert stats["max_callers_per_flight"] == 20
+    assert stats["in_flight"] == 0
+
+def test_a_failure_is_shared_and_not_remembered():
+    flights = SingleFlight()
+    attempts = []
+
+    async def fetch():
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        if len(attempts) == 1:
+            raise RuntimeError("upstream down")
+        return "ok"
+
+    async def main():
+        first = await asyncio.gather(*(flights.do("key", fetch) for _ in range(5)), return_exceptions=True)
+        second = await flights.do("key", fetch)
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in first)
+    assert second == "ok"
+    assert len(attempts) == 2
+
+def test_concurrent_flavor_misses_make_one_upstream_request(stub_api):
+    stub_api.delay = 0.2
+
+    async def main():
+        return await asyncio.gather(*(flavordb_service.get_flavor_data("single flight test") for _ in range(20)))
+
+    results = asyncio.run(main())
+    assert stub_api.counts["requests"] == 1
+    assert all(result == results[0] and "error" not in result for result in results)